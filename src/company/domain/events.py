@@ -1,12 +1,13 @@
-import pydantic
-from typing import Literal
+import dataclasses
 from src.shared import base_types
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class _CompanyEvent(base_types.DomainEvent):
-    domain_name: str = pydantic.Field(default="Company")
+    domain_name: str = "Company"
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class CompanyCreated(_CompanyEvent):
     company_id: str
     name: str
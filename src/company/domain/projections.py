@@ -0,0 +1,22 @@
+from typing import List
+from src.shared import base_types
+
+
+######### Companies by country ##################################
+
+
+class CompaniesByCountryId(base_types.EntityId):
+    country: base_types.Country
+
+
+class CompaniesByCountry(base_types.Projection):
+    id: CompaniesByCountryId
+    companies: int = 0
+    enabled_companies: int = 0
+    _events: List[base_types.DomainEvent] = []
+
+    @base_types.update_last_udpate_date
+    def add(self, enabled: bool, qty: int = 1) -> None:
+        self.companies += qty
+        if enabled:
+            self.enabled_companies += qty
@@ -1,7 +1,9 @@
 from src.company.service import commands, company as services
-from src.shared.adapters import unit_of_work
+from src.shared.adapters import clients, unit_of_work
 from typing import Dict, Any
 
+clients.prewarm_from_environment()
+
 
 def handler(event: Dict[str, Any], context: Any) -> None:
     try:
@@ -1,12 +1,24 @@
-from src.company.service import commands, company as services
-from src.shared.adapters import unit_of_work
-from typing import Dict, Any
+from src.company.domain import events
+from src.shared import logging
+from src.shared.adapters import event_consumer
+from typing import Dict, Any, Optional
 
+_LOGGER = logging.get_lambda_logger()
 
-def handler(event: Dict[str, Any], context: Any) -> None:
+consumer = event_consumer.EventConsumer(registry=event_consumer.EventRegistry())
+
+
+@consumer.subscribe(events.CompanyCreated)
+def on_company_created(event: events.CompanyCreated) -> None:
+    _LOGGER.info(
+        f"Company {event.company_id} created: {event.name} ({event.country.value})"
+    )
+
+
+def handler(event: Dict[str, Any], context: Any) -> Optional[Dict[str, Any]]:
     try:
-        print("Testing event bridge")
         print(event)
+        return consumer.handle(event=event)
     except Exception as ex:
         print(ex)
         raise
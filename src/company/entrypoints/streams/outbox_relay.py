@@ -0,0 +1,12 @@
+from src.shared.adapters import clients, outbox
+from typing import Dict, Any
+
+clients.prewarm_from_environment()
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    try:
+        return outbox.OutboxRelay().handle(event=event)
+    except Exception as ex:
+        print(ex)
+        raise
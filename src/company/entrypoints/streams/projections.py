@@ -0,0 +1,18 @@
+from src.company.service import projections
+from src.shared.adapters import clients, projection_engine, unit_of_work
+from typing import Dict, Any
+
+clients.prewarm_from_environment()
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    try:
+        uow = unit_of_work.DynamoDbUnitOfWork()
+        engine = projection_engine.ProjectionEngine(
+            uow=uow, checkpoints_table_name=projections.read_models_table_name()
+        )
+        engine.register(projections.companies_by_country_projector(uow=uow))
+        return engine.handle(event=event)
+    except Exception as ex:
+        print(ex)
+        raise
@@ -1,22 +1,33 @@
 from src.company.service import commands, exceptions
 from src.shared import base_types
-from src.shared.adapters import unit_of_work, event_publisher
+from src.shared.adapters import unit_of_work
 from src.company.domain import aggregate
-from src.shared.adapters.persistence import dynamodb_repository
+from src.shared.adapters.persistence import dynamodb_repository, item_cache
 
 
 class Settings(base_types.Settings):
     aggregate_company_table_name: str
+    # Companies rarely change. With a TTL > 0 the warm Lambdas keep them in memory
+    # and see the updates made by other Lambdas up to the TTL later
+    company_cache_ttl_seconds: int = 0
 
 
 def company_repository_instance(
     uow: unit_of_work.UnitOfWork,
 ) -> dynamodb_repository.DynamoDbRepository:
-    _SETTINGS = Settings()  # type: ignore
+    _SETTINGS = base_types.get_settings(Settings)
+    cache = (
+        item_cache.get_cache(
+            aggregate.Company, ttl_seconds=_SETTINGS.company_cache_ttl_seconds
+        )
+        if _SETTINGS.company_cache_ttl_seconds > 0
+        else None
+    )
     return dynamodb_repository.DynamoDbRepository(
         session=uow.session,
         table_name=_SETTINGS.aggregate_company_table_name,
         entity_type=aggregate.Company,
+        cache=cache,
     )
 
 
@@ -32,10 +43,9 @@ def create_new_company(
 
     with uow.transaction():
         company_repository.put(item=company)
-    events = company.pull_events()
-    _message_bus_client = event_publisher.EventBridgePublisher()
-    print(f"Events to publish: [{len(events)}]")
-    _message_bus_client.publish(events=events)
+        events = company.pull_events()
+        print(f"Events to publish: [{len(events)}]")
+        uow.publish_events(events=events)
     print("Company was saved successfuly")
 
 
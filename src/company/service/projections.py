@@ -0,0 +1,57 @@
+from src.shared import base_types
+from src.shared.adapters import projection_engine, unit_of_work
+from src.shared.adapters.projection_engine import Change, ReadModels
+from src.company.domain import aggregate, projections
+from src.shared.adapters.persistence import dynamodb_repository
+
+
+class Settings(base_types.Settings):
+    company_read_models_table_name: str
+
+
+def read_models_table_name() -> str:
+    return base_types.get_settings(Settings).company_read_models_table_name
+
+
+def companies_by_country_repository_instance(
+    uow: unit_of_work.UnitOfWork,
+) -> dynamodb_repository.DynamoDbRepository:
+    return dynamodb_repository.DynamoDbRepository(
+        session=uow.session,
+        table_name=read_models_table_name(),
+        entity_type=projections.CompaniesByCountry,
+    )
+
+
+def companies_by_country_projector(
+    uow: unit_of_work.UnitOfWork,
+) -> projection_engine.Projector:
+    repository = companies_by_country_repository_instance(uow=uow)
+
+    def project(change: Change, read_models: ReadModels) -> None:
+        if not {"country", "status"} & change.changed_fields:
+            return
+        for image, qty in ((change.old, -1), (change.new, 1)):
+            if image is None:
+                continue
+            country = base_types.Country(image["country"])
+            id = projections.CompaniesByCountryId(country=country)
+            read_model = read_models.get(
+                repository=repository,
+                id=id,
+                default=lambda: projections.CompaniesByCountry(id=id),
+            )
+            read_model.add(
+                enabled=image["status"] == aggregate.CompanyStatus.ENABLED, qty=qty
+            )
+
+    return project
+
+
+def get_companies_by_country(
+    uow: unit_of_work.UnitOfWork, country: base_types.Country
+) -> projections.CompaniesByCountry:
+    repository = companies_by_country_repository_instance(uow=uow)
+    id = projections.CompaniesByCountryId(country=country)
+    read_model = repository.find_by_id(id=id)
+    return read_model or projections.CompaniesByCountry(id=id)
@@ -1,8 +1,7 @@
 import enum
-from typing import List
+from typing import List, ClassVar, Dict, Final, Type
 from pydantic import EmailStr
 from src.shared import base_types
-from src.shared.base_types import update_last_udpate_date
 from src.employee.domain import events
 
 
@@ -20,48 +19,121 @@ class EmployeeStatus(base_types.NamedEnum):
     BLOCKED = enum.auto()
 
 
-class Employee(base_types.DomainAggregate):
+class Employee(base_types.EventSourcedAggregate):
     id: EmployeeId
     company_id: str
     status: EmployeeStatus
     _events: List[base_types.DomainEvent] = []
+    secondary_indexes: ClassVar[List[base_types.SecondaryIndex]] = [
+        base_types.SecondaryIndex(name="company_id-index", partition_key="company_id")
+    ]
 
     @classmethod
     def create(cls, name: str, email: str, company_id: str) -> "Employee":
+        # One timestamp for the aggregate and its event, so the aggregate
+        # rebuilt from the event (from_event) is the same
+        now = base_types.EpochTime.now()
         entity = cls(
             id=EmployeeId(name=name, email=email),
             company_id=company_id,
             status=EmployeeStatus.ACTIVE,
+            created=now,
+            last_update=now,
         )
         entity.add_event(
             events.EmployeeCreated(
                 employee_id=entity.id._key(),
                 name=name,
+                email=email,
                 company_id=company_id,
+                created=now,
             )
         )
         return entity
 
-    @update_last_udpate_date
-    def active(self):
-        self.status = EmployeeStatus.ACTIVE
-        self._events.append(events.EmployeeActivated(employee_id=self.id.email))
+    def active(self) -> None:
+        self._update_status(event_type=events.EmployeeActivated)
 
-    @update_last_udpate_date
-    def inactive(self):
-        self.status = EmployeeStatus.INACTIVE
-        self._events.append(events.EmployeeDisabled(employee_id=self.id.email))
+    def inactive(self) -> None:
+        self._update_status(event_type=events.EmployeeDisabled)
 
-    @update_last_udpate_date
-    def block(self):
-        self.status = EmployeeStatus.BLOCKED
-        self._events.append(events.EmployeeBlocked(employee_id=self.id.email))
+    def block(self) -> None:
+        self._update_status(event_type=events.EmployeeBlocked)
 
-    def is_actived(self):
+    @classmethod
+    def active_many(cls, employees: List["Employee"]) -> None:
+        cls._update_status_many(employees, event_type=events.EmployeeActivated)
+
+    @classmethod
+    def inactive_many(cls, employees: List["Employee"]) -> None:
+        cls._update_status_many(employees, event_type=events.EmployeeDisabled)
+
+    @classmethod
+    def block_many(cls, employees: List["Employee"]) -> None:
+        """Block all the employees at once: they share the update timestamp. Save
+        them with DynamoDbRepository.update_many (e.g. within uow.batch())"""
+        cls._update_status_many(employees, event_type=events.EmployeeBlocked)
+
+    def _update_status(self, event_type: Type[events._EmployeeStatusUpdated]) -> None:
+        now = base_types.EpochTime.now()
+        self.status = _STATUS_BY_EVENT[event_type]
+        self.last_update = now
+        self._events.append(
+            event_type(employee_id=self.id.email, created=now, last_update=now)
+        )
+
+    @staticmethod
+    def _update_status_many(
+        employees: List["Employee"],
+        event_type: Type[events._EmployeeStatusUpdated],
+    ) -> None:
+        # The fields are set through __dict__ and marked dirty once, instead of
+        # going through the validation of each assignment (and its dirty
+        # tracking) two times per employee
+        now = base_types.EpochTime.now()
+        status = _STATUS_BY_EVENT[event_type]
+        for employee in employees:
+            values = employee.__dict__
+            values["status"] = status
+            values["last_update"] = now
+            employee.__pydantic_fields_set__.update(_STATUS_FIELDS)
+            employee.mark_dirty(*_STATUS_FIELDS)
+            employee._events.append(
+                event_type(employee_id=employee.id.email, created=now, last_update=now)
+            )
+
+    @classmethod
+    def from_event(cls, event: base_types.DomainEvent) -> "Employee":
+        if not isinstance(event, events.EmployeeCreated):
+            raise ValueError(f"Employee can't be created from {type(event).__name__}")
+        return cls(
+            id=EmployeeId(name=event.name, email=event.email),
+            company_id=event.company_id,
+            status=EmployeeStatus.ACTIVE,
+            created=event.created,
+            last_update=event.created,
+        )
+
+    def apply(self, event: base_types.DomainEvent) -> None:
+        status = _STATUS_BY_EVENT.get(type(event))
+        if status is None or not isinstance(event, events._EmployeeStatusUpdated):
+            raise ValueError(f"Employee can't apply {type(event).__name__}")
+        self.status = status
+        self.last_update = event.last_update
+
+    def is_actived(self) -> bool:
         return self.status == EmployeeStatus.ACTIVE
 
-    def is_inactived(self):
+    def is_inactived(self) -> bool:
         return self.status == EmployeeStatus.INACTIVE
 
-    def is_blocked(self):
+    def is_blocked(self) -> bool:
         return self.status == EmployeeStatus.BLOCKED
+
+
+_STATUS_FIELDS: Final = ("status", "last_update")
+_STATUS_BY_EVENT: Dict[Type[base_types.DomainEvent], EmployeeStatus] = {
+    events.EmployeeActivated: EmployeeStatus.ACTIVE,
+    events.EmployeeDisabled: EmployeeStatus.INACTIVE,
+    events.EmployeeBlocked: EmployeeStatus.BLOCKED,
+}
@@ -1,31 +1,38 @@
-import pydantic
+import dataclasses
 from src.shared import base_types
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class _EmployeeEvent(base_types.DomainEvent):
-    domain_name: str = pydantic.Field(default="Employee")
+    domain_name: str = "Employee"
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class EmployeeCreated(_EmployeeEvent):
     employee_id: str
     name: str
+    email: str
     company_id: str
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class _EmployeeStatusUpdated(_EmployeeEvent):
     employee_id: str
-    last_update: base_types.EpochTime = pydantic.Field(
+    last_update: base_types.EpochTime = dataclasses.field(
         default_factory=base_types.EpochTime.now
     )
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class EmployeeActivated(_EmployeeStatusUpdated):
     ...
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class EmployeeDisabled(_EmployeeStatusUpdated):
     ...
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class EmployeeBlocked(_EmployeeStatusUpdated):
     ...
@@ -0,0 +1,55 @@
+import os
+import threading
+from typing import Any, Dict, Final, Literal, cast
+
+#########################################################################################
+#           AWS CLIENTS REGISTRY                                                        #
+#########################################################################################
+# Clients are created once per process (Lambda container) and reused across the
+# warm invocations. Setting PREWARM_AWS_CLIENTS (e.g. "dynamodb,events") creates
+# them during the init phase, when the handler module is imported.
+
+PREWARM_ENV_VAR: Final = "PREWARM_AWS_CLIENTS"
+# Services used by the shared adapters. It only selects the boto3 client overloads
+# for mypy: the clients of other services are created the same way
+ServiceName = Literal["dynamodb", "events"]
+
+_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_client(service_name: str) -> Any:
+    client = _clients.get(service_name)
+    if client is None:
+        # boto3 default session is not thread safe when it creates clients
+        with _lock:
+            client = _clients.get(service_name)
+            if client is None:
+                import boto3
+
+                client = boto3.client(cast(ServiceName, service_name))
+                _clients[service_name] = client
+    return client
+
+
+def get_dynamodb_client() -> Any:
+    return get_client("dynamodb")
+
+
+def get_events_client() -> Any:
+    return get_client("events")
+
+
+def prewarm(*service_names: str) -> None:
+    for service_name in service_names:
+        get_client(service_name)
+
+
+def prewarm_from_environment() -> None:
+    service_names = os.environ.get(PREWARM_ENV_VAR, "")
+    prewarm(*(name.strip() for name in service_names.split(",") if name.strip()))
+
+
+def clear() -> None:
+    with _lock:
+        _clients.clear()
@@ -0,0 +1,148 @@
+import json
+from typing import Any, Callable, Dict, Final, List, Optional, Tuple, Type, TypeVar
+from src.shared import base_types, logging
+from src.shared.adapters.persistence import dynamodb_codec
+
+_LOGGER = logging.get_lambda_logger()
+
+#########################################################################################
+#           EVENT CONSUMER                                                              #
+#########################################################################################
+# Turn the records received by a Lambda back into the DomainEvents published
+# (see EventBridgePublisher) and dispatch them to the handlers subscribed.
+# Supported payloads:
+#   - SQS batches whose bodies are EventBridge events (EventBridge -> SQS)
+#   - DynamoDB Streams batches of the outbox table (see outbox module)
+#   - A single EventBridge event (EventBridge -> Lambda)
+# For batches the partial batch response is returned, so only the records
+# failed are retried (ReportBatchItemFailures must be enabled)
+
+DEFAULT_CONSUMER_MAX_WORKERS: Final = 4
+
+EventHandler = Callable[[base_types.DomainEvent], None]
+T = TypeVar("T", bound=base_types.DomainEvent)
+
+
+class UnknownEventTypeError(Exception):
+    ...
+
+
+class EventRegistry:
+    """Event types by the DetailType they are published with (and class name)"""
+
+    def __init__(self) -> None:
+        self._event_types: Dict[str, Type[base_types.DomainEvent]] = {}
+
+    def register(
+        self, event_type: Type[base_types.DomainEvent]
+    ) -> Type[base_types.DomainEvent]:
+        self._event_types[str(event_type)] = event_type
+        self._event_types[event_type.__name__] = event_type
+        return event_type
+
+    def resolve(self, detail_type: str) -> Type[base_types.DomainEvent]:
+        event_type = self._event_types.get(detail_type)
+        if event_type is None:
+            raise UnknownEventTypeError(f"Event type {detail_type} is not registered")
+        return event_type
+
+    def deserialize(self, detail_type: str, detail: Any) -> base_types.DomainEvent:
+        if isinstance(detail, str):
+            detail = json.loads(detail)
+        return base_types.validate_event(self.resolve(detail_type), detail)
+
+
+class EventConsumer:
+    def __init__(
+        self,
+        registry: EventRegistry,
+        max_workers: int = DEFAULT_CONSUMER_MAX_WORKERS,
+    ) -> None:
+        """max_workers: records processed concurrently. Use 1 when the order of
+        the records matters (e.g. events of the same aggregate in streams)"""
+        self._registry = registry
+        self._max_workers = max_workers
+        # Each handler only receives events of the type it is subscribed to
+        self._handlers: Dict[
+            Type[base_types.DomainEvent], List[Callable[[Any], None]]
+        ] = {}
+
+    def subscribe(
+        self, event_type: Type[T]
+    ) -> Callable[[Callable[[T], None]], Callable[[T], None]]:
+        """Decorator to subscribe a handler to the event type. The event type is
+        registered too"""
+
+        def decorator(handler: Callable[[T], None]) -> Callable[[T], None]:
+            self._registry.register(event_type)
+            self._handlers.setdefault(event_type, []).append(handler)
+            return handler
+
+        return decorator
+
+    def handle(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if "Records" not in event:
+            # Single EventBridge event: a failure is raised so Lambda retries it
+            try:
+                domain_event = self._registry.deserialize(
+                    event["detail-type"], event["detail"]
+                )
+            except UnknownEventTypeError as e:
+                _LOGGER.warning(f"Event {event.get('id')} skipped. {str(e)}")
+                return None
+            self._dispatch(domain_event)
+            return None
+
+        records: List[Dict[str, Any]] = event["Records"]
+        if self._max_workers > 1 and len(records) > 1:
+            from concurrent import futures
+
+            with futures.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                results = list(executor.map(self._process_record, records))
+        else:
+            results = [self._process_record(record) for record in records]
+        failures = [identifier for identifier, succeeded in results if not succeeded]
+        _LOGGER.info(f"Records processed [{len(records)}]. Failed [{len(failures)}]")
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": identifier} for identifier in failures
+            ]
+        }
+
+    def _process_record(self, record: Dict[str, Any]) -> Tuple[str, bool]:
+        identifier = record_identifier(record)
+        try:
+            parsed = self._parse_record(record)
+            if parsed is not None:
+                self._dispatch(self._registry.deserialize(*parsed))
+            return identifier, True
+        except UnknownEventTypeError as e:
+            _LOGGER.warning(f"Record {identifier} skipped. {str(e)}")
+            return identifier, True
+        except Exception:
+            _LOGGER.exception(f"Error processing record {identifier}")
+            return identifier, False
+
+    def _parse_record(self, record: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+        """Return the (detail type, detail) of the record. None for the stream
+        records that are not event insertions"""
+        if record.get("eventSource") == "aws:sqs":
+            body = json.loads(record["body"])
+            return body["detail-type"], body["detail"]
+        if record.get("eventSource") == "aws:dynamodb":
+            if record.get("eventName") != "INSERT":
+                return None
+            image = record["dynamodb"]["NewImage"]
+            entry = json.loads(dynamodb_codec.decode_any(image["entry"]))
+            return entry["DetailType"], entry["Detail"]
+        raise ValueError(f"Unsupported record source {record.get('eventSource')}")
+
+    def _dispatch(self, event: base_types.DomainEvent) -> None:
+        for handler in self._handlers.get(type(event), []):
+            handler(event)
+
+
+def record_identifier(record: Dict[str, Any]) -> str:
+    if "messageId" in record:
+        return record["messageId"]  # type: ignore
+    return record["dynamodb"]["SequenceNumber"]  # type: ignore
@@ -1,21 +1,53 @@
 import pydantic
 import logging
-import json
-from typing import Protocol, List, TypeVar, Any, Dict, Type
+import functools
+from typing import Protocol, List, TypeVar, Any, Dict, Type, Optional, Final
 from src.shared import base_types
-import boto3
-import backoff
+from src.shared import retry
+from src.shared.adapters import clients
 
 _LOGGER = logging.Logger("Event publisher")
 E = TypeVar("E", bound=base_types.DomainEvent)
 
 
+MAX_EVENT_BRIDGE_ENTRIES_PER_CALL: Final = 10
+MAX_EVENT_BRIDGE_CALL_SIZE_BYTES: Final = 256 * 1024
+DEFAULT_PUBLISH_MAX_WORKERS: Final = 4
+
+
+class EventPublishResult(base_types.ValueObject):
+    event_id: str
+    succeeded: bool
+    event_bridge_event_id: Optional[str] = None
+    error_code: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+class PublishReport(base_types.ValueObject):
+    results: List[EventPublishResult] = []
+
+    @property
+    def succeeded(self) -> bool:
+        return all(result.succeeded for result in self.results)
+
+    @property
+    def failed(self) -> List[EventPublishResult]:
+        return [result for result in self.results if not result.succeeded]
+
+
 class EventPublishError(Exception):
-    ...
+    def __init__(self, *args: Any, report: Optional[PublishReport] = None) -> None:
+        super().__init__(*args)
+        self.report = report
 
 
 class EventPublisher(Protocol):
-    def publish(self, events: List[E]) -> None:
+    def publish(self, events: List[E]) -> PublishReport:
+        ...
+
+
+class AsyncEventPublisher(Protocol):
+    async def publish(self, events: List[E]) -> PublishReport:
         ...
 
 
@@ -26,7 +58,12 @@ class _CommonSettings(base_types.Settings):
     )
 
 
-COMMON_SETTINGS = _CommonSettings()
+def _backoff_default_tries() -> int:
+    return base_types.get_settings(_CommonSettings).backoff_default_tries
+
+
+def _backoff_default_max_time() -> int:
+    return base_types.get_settings(_CommonSettings).backoff_default_max_time
 
 
 class EventBridgePublisher:
@@ -35,64 +72,193 @@ class EventBridgePublisher:
             default="TO-FILL", env="EVENT_BRIDGE_TOPIC_ARN"
         )
 
-    class EventBody(base_types.ValueObject):
-        eventbus_name_arn: str = pydantic.Field(alias="EventBusName")
-        source: str = pydantic.Field(
-            alias="Source", description="Event Source. In our case (EventDomain source)"
-        )
-        detail_type: str = pydantic.Field(
-            alias="DetailType",
-            description="Event type. In our case we will use event class name",
-        )
-        detail: str = pydantic.Field(
-            alias="Detail", description="Event parsed to json format"
-        )
-
-    def __init__(self) -> None:
-        print("init eventbridge client")
-        self._settings = EventBridgePublisher._Settings()
-        self._client = boto3.client("events")
+    def __init__(self, max_workers: int = DEFAULT_PUBLISH_MAX_WORKERS) -> None:
+        self._settings = base_types.get_settings(EventBridgePublisher._Settings)
+        self._client = clients.get_events_client()
+        self._max_workers = max_workers
 
-    @backoff.on_exception(
-        backoff.fibo,
-        EventPublishError,
-        max_tries=COMMON_SETTINGS.backoff_default_tries,
-        max_time=COMMON_SETTINGS.backoff_default_max_time,
-    )
-    def publish(self, events: List[E]) -> None:
+    def publish(self, events: List[E]) -> PublishReport:
+        """Publish the events in put_events calls that respect the EventBridge limits
+        (entries qty and size). The calls run concurrently and only the entries
+        failed are retried. Raise EventPublishError (with the report) if any event
+        couldn't be published"""
         _LOGGER.info(f"EventBridge publisher. Events qty [{len(events)}]")
         if not events:
             _LOGGER.warning("No events provided. List passed is empty")
-            return
+            return PublishReport()
+
+        entries = self.convert_to_event_bridge_events(domain_events=events)
+        return self.publish_entries(
+            event_ids=[event.id for event in events], entries=entries
+        )
+
+    def publish_entries(
+        self, event_ids: List[str], entries: List[Dict[str, Any]]
+    ) -> PublishReport:
+        """Publish EventBridge entries already converted (e.g. read from the outbox).
+        event_ids identifies each entry in the report"""
+        report = self._publish_entries(event_ids=event_ids, entries=entries)
+        if not report.succeeded:
+            for result in report.failed:
+                _LOGGER.error(
+                    f"Failed to publish event {result.event_id}: {result.error_code} - {result.error_message}"
+                )
+            raise EventPublishError(
+                f"[{len(report.failed)}] of [{len(report.results)}] events failed",
+                report=report,
+            )
+        _LOGGER.info("Events published successfuly ")
+        return report
 
+    def _publish_entries(
+        self, event_ids: List[str], entries: List[Dict[str, Any]]
+    ) -> PublishReport:
+        results: Dict[int, EventPublishResult] = {}
+        chunks: List[List[int]] = []
+        chunk: List[int] = []
+        chunk_size = 0
+        for index, entry in enumerate(entries):
+            entry_size = event_bridge_entry_size(entry=entry)
+            if entry_size > MAX_EVENT_BRIDGE_CALL_SIZE_BYTES:
+                results[index] = EventPublishResult(
+                    event_id=event_ids[index],
+                    succeeded=False,
+                    error_code="EntryTooLarge",
+                    error_message=f"Entry size {entry_size} exceeds the EventBridge limit",
+                )
+                continue
+            if chunk and (
+                len(chunk) == MAX_EVENT_BRIDGE_ENTRIES_PER_CALL
+                or chunk_size + entry_size > MAX_EVENT_BRIDGE_CALL_SIZE_BYTES
+            ):
+                chunks.append(chunk)
+                chunk, chunk_size = [], 0
+            chunk.append(index)
+            chunk_size += entry_size
+        if chunk:
+            chunks.append(chunk)
+
+        def publish_chunk(indexes: List[int]) -> None:
+            self._put_events_with_retry(
+                pending=list(indexes),
+                event_ids=event_ids,
+                entries=entries,
+                results=results,
+            )
+
+        if len(chunks) > 1 and self._max_workers > 1:
+            from concurrent import futures
+
+            with futures.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                list(executor.map(publish_chunk, chunks))
+        else:
+            for indexes in chunks:
+                publish_chunk(indexes)
+        return PublishReport(results=[results[i] for i in range(len(entries))])
+
+    @retry.on_predicate(
+        "fibo",
+        bool,
+        max_tries=_backoff_default_tries,
+        max_time=_backoff_default_max_time,
+    )
+    def _put_events_with_retry(
+        self,
+        pending: List[int],
+        event_ids: List[str],
+        entries: List[Dict[str, Any]],
+        results: Dict[int, EventPublishResult],
+    ) -> List[int]:
+        # pending is replaced in place by the entries failed, so each retry
+        # only sends again the events that weren't published
         try:
-            events_body_parsed = [
-                self.convert_to_event_bridge_event(domain_event=event)
-                for event in events
-            ]
-            response = self._put_events(events=events_body_parsed)
+            response = self._put_events(events=[entries[i] for i in pending])
             _LOGGER.info(f"EVENT BRIDGE RESPONSE: {str(response)}")
-            if response["FailedEntryCount"] == 0:
-                _LOGGER.info("Events published successfuly ")
-            else:
-                entries_failed = response["Entries"]
-                for entry in entries_failed:
-                    if "ErrorCode" in entry:
-                        _LOGGER.error(
-                            f"Failed to publish event: {entry['ErrorCode']} - {entry['ErrorMessage']}"
-                        )
-                raise EventPublishError()
+            response_entries = response.get("Entries") or [{} for _ in pending]
         except Exception as ex:
-            _LOGGER.error("Error when try to publish event domain in Event Source")
-            raise EventPublishError() from ex
+            _LOGGER.exception("Error when try to publish event domain in Event Source")
+            response_entries = [
+                {"ErrorCode": type(ex).__name__, "ErrorMessage": str(ex)}
+                for _ in pending
+            ]
+        failed = []
+        for index, response_entry in zip(pending, response_entries):
+            results[index] = EventPublishResult(
+                event_id=event_ids[index],
+                succeeded="ErrorCode" not in response_entry,
+                event_bridge_event_id=response_entry.get("EventId"),
+                error_code=response_entry.get("ErrorCode"),
+                error_message=response_entry.get("ErrorMessage"),
+            )
+            if "ErrorCode" in response_entry:
+                failed.append(index)
+        pending[:] = failed
+        return failed
 
     def convert_to_event_bridge_event(self, domain_event: E) -> Dict[str, Any]:
-        return EventBridgePublisher.EventBody(
-            EventBusName=self._settings.event_bridge_topic_arn,
-            Source=domain_event.domain_name,
-            DetailType=str(type(domain_event)),
-            Detail=json.dumps(domain_event.model_dump()),
-        ).model_dump(by_alias=True)
+        return self.convert_to_event_bridge_events(domain_events=[domain_event])[0]
+
+    def convert_to_event_bridge_events(
+        self, domain_events: List[E]
+    ) -> List[Dict[str, Any]]:
+        return convert_to_event_bridge_events(
+            domain_events=domain_events,
+            event_bus_name=self._settings.event_bridge_topic_arn,
+        )
 
     def _put_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
         return self._client.put_events(Entries=events)  # type: ignore
+
+
+def convert_to_event_bridge_events(
+    domain_events: List[E], event_bus_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Build the EventBridge entries of the events. Detail is encoded by
+    pydantic-core straight to JSON (encode_event), without the intermediate
+    dict. No EventBridge client is needed (e.g. for the outbox)"""
+    if event_bus_name is None:
+        event_bus_name = base_types.get_settings(
+            EventBridgePublisher._Settings
+        ).event_bridge_topic_arn
+    detail_types: Dict[Type[Any], str] = {}
+    entries = []
+    for domain_event in domain_events:
+        event_type = type(domain_event)
+        detail_type = detail_types.get(event_type)
+        if detail_type is None:
+            detail_type = detail_types[event_type] = str(event_type)
+        entries.append(
+            {
+                "EventBusName": event_bus_name,
+                "Source": domain_event.domain_name,
+                "DetailType": detail_type,
+                "Detail": base_types.encode_event(domain_event),
+            }
+        )
+    return entries
+
+
+def event_bridge_entry_size(entry: Dict[str, Any]) -> int:
+    """Return the entry size as EventBridge computes it:
+    https://docs.aws.amazon.com/eventbridge/latest/userguide/eb-putevent-size.html"""
+    size = 14 if entry.get("Time") else 0
+    for field in ("Source", "DetailType", "Detail"):
+        size += len(entry.get(field, "").encode())
+    for resource in entry.get("Resources", []):
+        size += len(resource.encode())
+    return size
+
+
+class AsyncEventBridgePublisher(AsyncEventPublisher):
+    """Awaitable facade of EventBridgePublisher. The blocking put_events call
+    runs in a worker thread"""
+
+    def __init__(self, publisher: Optional[EventBridgePublisher] = None) -> None:
+        self._publisher = publisher or EventBridgePublisher()
+
+    async def publish(self, events: List[E]) -> PublishReport:
+        import asyncio
+
+        return await asyncio.to_thread(
+            functools.partial(self._publisher.publish, events=events)
+        )
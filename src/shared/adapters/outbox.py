@@ -0,0 +1,92 @@
+import json
+import time
+from typing import Any, Dict, Final, List, Optional
+from src.shared import base_types, logging
+from src.shared.adapters import event_publisher
+from src.shared.adapters.persistence import commons as persistence_commons
+from src.shared.adapters.persistence import dynamodb_codec, dynamodb_repository
+
+_LOGGER = logging.get_lambda_logger()
+
+#########################################################################################
+#           TRANSACTIONAL OUTBOX                                                        #
+#########################################################################################
+# In outbox mode the unit of work writes the events, already converted to
+# EventBridge entries, in the outbox table within the same DynamoDB request that
+# persists the aggregates. The relay, triggered by the outbox table stream,
+# forwards them to EventBridge. The records expire through the table TTL.
+
+OUTBOX_KEY_NAME: Final = "id._key"
+OUTBOX_RECORD_TTL_SECONDS: Final = 24 * 60 * 60
+
+
+class OutboxSettings(base_types.Settings):
+    outbox_table_name: Optional[str] = None
+
+
+def outbox_table_name() -> Optional[str]:
+    return base_types.get_settings(OutboxSettings).outbox_table_name
+
+
+def event_write_operations(
+    table_name: str,
+    events: List[base_types.DomainEvent],
+) -> List[persistence_commons.WriteOperation]:
+    # The events are created without validation: they are validated before
+    # being stored, so the relay never forwards an invalid entry
+    events = [base_types.validate_event(type(event), event) for event in events]
+    now = int(time.time())
+    entries = event_publisher.convert_to_event_bridge_events(domain_events=events)
+    return [
+        dynamodb_repository._DynamoDbPutOperation(
+            table_name=table_name,
+            key_name=OUTBOX_KEY_NAME,
+            item_serialized={
+                OUTBOX_KEY_NAME: {"S": event.id},
+                "entry": {"S": json.dumps(entry)},
+                "created_at": {"N": str(now)},
+                "expires_at": {"N": str(now + OUTBOX_RECORD_TTL_SECONDS)},
+            },
+        )
+        for event, entry in zip(events, entries)
+    ]
+
+
+class OutboxRelay:
+    """Forward the outbox records received from the DynamoDB stream to EventBridge.
+    Return the partial batch response, so only the failed records are retried"""
+
+    def __init__(
+        self, publisher: Optional[event_publisher.EventBridgePublisher] = None
+    ) -> None:
+        self._publisher = publisher or event_publisher.EventBridgePublisher()
+
+    def handle(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        sequence_numbers: List[str] = []
+        event_ids: List[str] = []
+        entries: List[Dict[str, Any]] = []
+        for record in event.get("Records", []):
+            if record.get("eventName") != "INSERT":
+                continue
+            image = record["dynamodb"]["NewImage"]
+            sequence_numbers.append(record["dynamodb"]["SequenceNumber"])
+            event_ids.append(dynamodb_codec.decode_any(image[OUTBOX_KEY_NAME]))
+            entries.append(json.loads(dynamodb_codec.decode_any(image["entry"])))
+        _LOGGER.info(f"Outbox relay. Events qty [{len(entries)}]")
+        if not entries:
+            return {"batchItemFailures": []}
+
+        try:
+            self._publisher.publish_entries(event_ids=event_ids, entries=entries)
+            return {"batchItemFailures": []}
+        except event_publisher.EventPublishError as e:
+            if e.report is None:
+                raise
+            failed_ids = {result.event_id for result in e.report.failed}
+            return {
+                "batchItemFailures": [
+                    {"itemIdentifier": sequence_number}
+                    for sequence_number, event_id in zip(sequence_numbers, event_ids)
+                    if event_id in failed_ids
+                ]
+            }
@@ -1,5 +1,6 @@
 from typing import Protocol, Dict, Any, TypeVar, Optional, List, Iterator, NewType
 from src.shared import base_types
+from src.shared.adapters.persistence.identity_map import IdentityMap
 
 E = TypeVar("E", bound=base_types.RepositoryAggregate)
 I = TypeVar("I", bound=base_types.EntityId)
@@ -22,10 +23,63 @@ class WriteOperation(Protocol):
     def entity_serialized(self) -> Dict[str, Any]:
         ...
 
+    @property
+    def size(self) -> int:
+        ...
+
+    @property
+    def bulk_request(self) -> Dict[str, Any]:
+        ...
+
+    def committed(self) -> None:
+        """Called by the session once the operation was written"""
+        ...
+
+    def conflicted(self) -> None:
+        """Called by the session when the condition of the operation failed"""
+        ...
+
+
+class ChunkWriteResult(base_types.ValueObject):
+    index: int
+    operations_qty: int
+    succeeded: bool
+    throttled: bool = False
+    error: Optional[str] = None
+
+
+class BatchWriteReport(base_types.ValueObject):
+    chunks: List[ChunkWriteResult] = []
+
+    @property
+    def succeeded(self) -> bool:
+        return all(chunk.succeeded for chunk in self.chunks)
+
+    @property
+    def failed_chunks(self) -> List[ChunkWriteResult]:
+        return [chunk for chunk in self.chunks if not chunk.succeeded]
+
+    @property
+    def throttled_chunks(self) -> List[ChunkWriteResult]:
+        return [chunk for chunk in self.chunks if chunk.throttled]
+
+
+class Page(base_types.ValueObject):
+    """Page of items. cursor is an opaque token to request the next page, None
+    in the last one"""
+
+    items: List[Any]
+    cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.cursor is not None
+
 
 class SessionDB(Protocol):
     _batches: Dict[str, WriteOperation] = {}
     client: Any
+    identity_map: IdentityMap
 
     def add_write_operation(self, operation: WriteOperation) -> None:
         ...
@@ -36,7 +90,10 @@ class SessionDB(Protocol):
     def execute_in_single_transaction(self) -> None:
         ...
 
-    def execute_in_batch_transaction(self) -> None:
+    def execute_in_batch_transaction(self, max_workers: int = 1) -> BatchWriteReport:
+        ...
+
+    def execute_in_bulk(self, max_workers: int = ...) -> BatchWriteReport:
         ...
 
 
@@ -50,5 +107,28 @@ class Repository(Protocol[E]):
     def find_by_id(self, id: I) -> Optional[E]:
         ...
 
+    def get_many(self, ids: List[I]) -> List[E]:
+        ...
+
+    def find_many(self, ids: List[I]) -> Dict[str, E]:
+        ...
+
     def get_all(self) -> Iterator[E]:
         ...
+
+
+class AsyncRepository(Protocol[E]):
+    def put(self, item: E) -> None:
+        ...
+
+    async def get_by_id(self, id: I) -> E:
+        ...
+
+    async def find_by_id(self, id: I) -> Optional[E]:
+        ...
+
+    async def get_many(self, ids: List[I]) -> List[E]:
+        ...
+
+    async def find_many(self, ids: List[I]) -> Dict[str, E]:
+        ...
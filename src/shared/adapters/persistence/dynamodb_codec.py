@@ -0,0 +1,288 @@
+import enum
+import types
+import typing
+import decimal
+import functools
+import pydantic
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+#########################################################################################
+#           DYNAMODB CODEC                                                              #
+#########################################################################################
+# The codec is compiled once per model type from its pydantic fields. Each field
+# gets its own encoder/decoder, so the serialization of an item doesn't need
+# to discover the type of every value again (as TypeSerializer does).
+
+Encoder = Callable[[Any], Dict[str, Any]]
+Decoder = Callable[[Dict[str, Any]], Any]
+
+_NULL: Dict[str, Any] = {"NULL": True}
+
+
+class DynamoDbCodec:
+    def __init__(self, model_type: Type[pydantic.BaseModel]) -> None:
+        self._model_type = model_type
+        self._encoders: List[Tuple[str, Encoder]] = []
+        self._decoders: Dict[str, Decoder] = {}
+        for name, field in model_type.model_fields.items():
+            encoder, decoder = _compile(field.annotation)
+            self._encoders.append((name, encoder))
+            self._decoders[name] = decoder
+
+    @property
+    def model_type(self) -> Type[pydantic.BaseModel]:
+        return self._model_type
+
+    def encode(
+        self, model: pydantic.BaseModel, fields: Optional[AbstractSet[str]] = None
+    ) -> Dict[str, Any]:
+        """Return the model as a DynamoDB item (attribute name -> attribute value).
+        With fields, only those attributes are encoded"""
+        values = model.__dict__
+        if fields is None:
+            return {name: encoder(values[name]) for name, encoder in self._encoders}
+        return {
+            name: encoder(values[name])
+            for name, encoder in self._encoders
+            if name in fields
+        }
+
+    def encode_many(
+        self,
+        models: Sequence[pydantic.BaseModel],
+        fields: Optional[AbstractSet[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """encode of several models, selecting the encoders of the fields once"""
+        encoders = (
+            self._encoders
+            if fields is None
+            else [(name, encoder) for name, encoder in self._encoders if name in fields]
+        )
+        return [
+            {name: encoder(model.__dict__[name]) for name, encoder in encoders}
+            for model in models
+        ]
+
+    def decode(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the DynamoDB item as a python dict ready to be validated by the model.
+        Attributes that don't belong to the model are decoded generically"""
+        decoders = self._decoders
+        return {
+            name: decoders.get(name, decode_any)(value) for name, value in item.items()
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def codec_for(model_type: Type[pydantic.BaseModel]) -> DynamoDbCodec:
+    return DynamoDbCodec(model_type=model_type)
+
+
+############## GENERIC ENCODE/DECODE ####################################################
+# Used when the annotation doesn't tell us enough (Any, unions, custom types)
+
+
+def encode_any(value: Any) -> Dict[str, Any]:
+    if value is None:
+        return _NULL
+    if isinstance(value, enum.Enum):
+        return encode_any(value.value)
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return {"N": str(value)}
+    if isinstance(value, pydantic.BaseModel):
+        return {"M": codec_for(type(value)).encode(value)}
+    if isinstance(value, dict):
+        return {"M": {str(k): encode_any(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {"L": [encode_any(v) for v in value]}
+    if isinstance(value, (bytes, bytearray)):
+        return {"B": bytes(value)}
+    if isinstance(value, (set, frozenset)):
+        return _encode_set(value)
+    raise TypeError(f"Unsupported type {type(value)} for value {value!r}")
+
+
+def _encode_set(value: Any) -> Dict[str, Any]:
+    if all(isinstance(v, str) for v in value):
+        return {"SS": list(value)}
+    if all(isinstance(v, (bytes, bytearray)) for v in value):
+        return {"BS": [bytes(v) for v in value]}
+    return {"NS": [str(v) for v in value]}
+
+
+def decode_any(attribute: Dict[str, Any]) -> Any:
+    ((type_name, value),) = attribute.items()
+    if type_name == "S":
+        return value
+    if type_name == "N":
+        return decimal.Decimal(value)
+    if type_name == "BOOL":
+        return value
+    if type_name == "NULL":
+        return None
+    if type_name == "M":
+        return {k: decode_any(v) for k, v in value.items()}
+    if type_name == "L":
+        return [decode_any(v) for v in value]
+    if type_name == "B":
+        return value
+    if type_name == "SS" or type_name == "BS":
+        return set(value)
+    if type_name == "NS":
+        return {decimal.Decimal(v) for v in value}
+    raise TypeError(f"Unsupported DynamoDB type {type_name}")
+
+
+############## ITEM SIZE ################################################################
+# Approximation of the rules DynamoDB uses to compute the item size:
+# https://docs.aws.amazon.com/amazondynamodb/latest/developerguide/CapacityUnitCalculations.html
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    """Return the estimated size in bytes of a DynamoDB item"""
+    return sum(
+        len(name.encode()) + attribute_size(value) for name, value in item.items()
+    )
+
+
+def attribute_size(attribute: Dict[str, Any]) -> int:
+    ((type_name, value),) = attribute.items()
+    if type_name == "S":
+        return len(value.encode())
+    if type_name == "N":
+        return _number_size(value)
+    if type_name == "B":
+        return len(value)
+    if type_name == "BOOL" or type_name == "NULL":
+        return 1
+    if type_name == "M":
+        return 3 + sum(
+            len(k.encode()) + attribute_size(v) + 1 for k, v in value.items()
+        )
+    if type_name == "L":
+        return 3 + sum(attribute_size(v) + 1 for v in value)
+    if type_name == "SS":
+        return sum(len(v.encode()) for v in value)
+    if type_name == "NS":
+        return sum(_number_size(v) for v in value)
+    if type_name == "BS":
+        return sum(len(v) for v in value)
+    raise TypeError(f"Unsupported DynamoDB type {type_name}")
+
+
+def _number_size(value: str) -> int:
+    significant_digits = value.lstrip("-").replace(".", "").strip("0")
+    return (len(significant_digits) + 1) // 2 + 1
+
+
+############## COMPILED ENCODE/DECODE ###################################################
+
+
+def _compile(annotation: Any) -> Tuple[Encoder, Decoder]:
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        return _compile_union(annotation)
+    if origin in (list, List):
+        return _compile_list(annotation)
+    if origin in (dict, Dict):
+        return _compile_dict(annotation)
+    if origin is not None or not isinstance(annotation, type):
+        return encode_any, decode_any
+    if issubclass(annotation, enum.Enum):
+        return _compile_enum(annotation)
+    if issubclass(annotation, pydantic.BaseModel):
+        return _compile_model(annotation)
+    if annotation is bool:
+        return (lambda v: {"BOOL": v}), _decode_value
+    if annotation is int:
+        return _encode_number, (lambda av: int(av["N"]))
+    if annotation is float:
+        return _encode_number, (lambda av: float(av["N"]))
+    if annotation is decimal.Decimal:
+        return _encode_number, (lambda av: decimal.Decimal(av["N"]))
+    if issubclass(annotation, str):
+        return (lambda v: {"S": v}), _decode_value
+    return encode_any, decode_any
+
+
+def _decode_value(attribute: Dict[str, Any]) -> Any:
+    for value in attribute.values():
+        return value
+
+
+def _encode_number(value: Any) -> Dict[str, Any]:
+    return {"N": str(value)}
+
+
+def _compile_union(annotation: Any) -> Tuple[Encoder, Decoder]:
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if len(args) != 1:
+        return encode_any, decode_any
+    encoder, decoder = _compile(args[0])
+
+    def encode_optional(value: Any) -> Dict[str, Any]:
+        return _NULL if value is None else encoder(value)
+
+    def decode_optional(attribute: Dict[str, Any]) -> Any:
+        return None if "NULL" in attribute else decoder(attribute)
+
+    return encode_optional, decode_optional
+
+
+def _compile_list(annotation: Any) -> Tuple[Encoder, Decoder]:
+    args = typing.get_args(annotation)
+    encoder, decoder = _compile(args[0]) if args else (encode_any, decode_any)
+
+    def encode_list(value: Any) -> Dict[str, Any]:
+        return {"L": [encoder(v) for v in value]}
+
+    def decode_list(attribute: Dict[str, Any]) -> Any:
+        return [decoder(v) for v in attribute["L"]]
+
+    return encode_list, decode_list
+
+
+def _compile_dict(annotation: Any) -> Tuple[Encoder, Decoder]:
+    args = typing.get_args(annotation)
+    encoder, decoder = _compile(args[1]) if args else (encode_any, decode_any)
+
+    def encode_dict(value: Any) -> Dict[str, Any]:
+        return {"M": {str(k): encoder(v) for k, v in value.items()}}
+
+    def decode_dict(attribute: Dict[str, Any]) -> Any:
+        return {k: decoder(v) for k, v in attribute["M"].items()}
+
+    return encode_dict, decode_dict
+
+
+def _compile_enum(enum_type: Type[enum.Enum]) -> Tuple[Encoder, Decoder]:
+    if issubclass(enum_type, str):
+        return (lambda v: {"S": v.value}), _decode_value
+    return (lambda v: encode_any(v.value)), decode_any
+
+
+def _compile_model(model_type: Type[pydantic.BaseModel]) -> Tuple[Encoder, Decoder]:
+    # The nested codec is resolved on first use, so self referenced models
+    # don't recurse forever while compiling
+    def encode_model(value: pydantic.BaseModel) -> Dict[str, Any]:
+        # A subclass instance (e.g. CompanyId in a field annotated as EntityId)
+        # is encoded with all of its own fields
+        return {"M": codec_for(type(value)).encode(value)}
+
+    def decode_model(attribute: Dict[str, Any]) -> Any:
+        return codec_for(model_type).decode(attribute["M"])
+
+    return encode_model, decode_model
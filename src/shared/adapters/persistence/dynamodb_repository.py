@@ -1,5 +1,32 @@
-from typing import Optional, Iterator, Type, Dict, Any, Final
-from src.shared.adapters.persistence import commons
+import abc
+import json
+import queue
+import base64
+import threading
+import functools
+from typing import (
+    Optional,
+    Iterator,
+    Type,
+    Dict,
+    Any,
+    Final,
+    List,
+    Callable,
+    AbstractSet,
+    Sequence,
+    Tuple,
+    Literal,
+    FrozenSet,
+)
+import pydantic
+from src.shared import base_types, retry
+from src.shared.adapters.persistence import (
+    commons,
+    dynamodb_codec,
+    identity_map,
+    item_cache,
+)
 from src.shared.adapters.persistence.commons import E, I
 
 
@@ -7,7 +34,33 @@ from src.shared.adapters.persistence.commons import E, I
 #           DYNAMODB REPOSITORY                                                         #
 #########################################################################################
 
-MAX_DYNAMO_DB_BATCH_SIZE_PER_TRX = 100
+DEFAULT_SCAN_PAGE_SIZE: Final = 100
+DEFAULT_QUERY_PAGE_SIZE: Final = 100
+DEFAULT_SCAN_MAX_QUEUED_PAGES: Final = 10
+_SCAN_QUEUE_PUT_TIMEOUT: Final = 0.1
+_SEGMENT_COMPLETED: Final = object()
+MAX_DYNAMO_DB_BATCH_GET_SIZE: Final = 100
+BATCH_GET_MAX_TRIES: Final = 5
+BATCH_GET_MAX_TIME: Final = 10
+
+
+class UnprocessedKeysError(Exception):
+    def __init__(self, keys_qty: int) -> None:
+        super().__init__(
+            f"DynamoDB left [{keys_qty}] keys unprocessed after all the retries"
+        )
+
+
+class InvalidCursorError(ValueError):
+    ...
+
+
+class SortKeyCondition(base_types.ValueObject):
+    """Condition on the sort key of a query. between takes two values, the
+    rest of the operators one"""
+
+    operator: Literal["=", "<", "<=", ">", ">=", "begins_with", "between"]
+    values: Tuple[Any, ...]
 
 
 class DynamoDbRepository(commons.Repository[E]):
@@ -16,71 +69,151 @@ class DynamoDbRepository(commons.Repository[E]):
         session: commons.SessionDB,
         table_name: str,
         entity_type: Type[E],
+        cache: Optional[item_cache.ItemCache] = None,
     ) -> None:
+        """cache: process level cache used for the reads by id (optional)"""
         self._session = session
         self._table_name = table_name
         self._key_name: Final = "id._key"
         self._entity_type = entity_type
-
-    @classmethod
-    def _deserializer_item(cls, dynamodb_record: Dict[str, Any]) -> Dict[str, Any]:
-        from boto3.dynamodb.types import TypeDeserializer
-
-        deserializer = TypeDeserializer()
-        parsed_record = {
-            k: deserializer.deserialize(v) for k, v in dynamodb_record.items()
+        self._codec = dynamodb_codec.codec_for(entity_type)
+        self._cache = cache
+        self._indexes = {
+            index.partition_key: index
+            for index in getattr(entity_type, "secondary_indexes", [])
         }
-        return parsed_record
 
-    @classmethod
-    def _serialize_entity(cls, entity: E) -> Dict[str, Any]:
-        from decimal import Decimal
+    def _deserializer_item(self, dynamodb_record: Dict[str, Any]) -> Dict[str, Any]:
+        return self._codec.decode(dynamodb_record)
 
-        nested_dict = entity.model_dump()
-        for k, v in nested_dict.items():
-            if isinstance(v, Decimal):
-                nested_dict[k] = float(v)
-        return nested_dict
+    def _deserializer_page(
+        self, dynamodb_records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        decode = self._codec.decode
+        return [decode(record) for record in dynamodb_records]
+
+    def _serialize_entity(
+        self, entity: E, fields: Optional[AbstractSet[str]] = None
+    ) -> Dict[str, Any]:
+        return self._codec.encode(entity, fields=fields)
 
     def put(self, item: E) -> None:
-        self._session.add_write_operation(
-            operation=self._build_write_operation(
-                item=item, operation_type=_DynamoDbPutOperation
-            )
+        operation = self._build_write_operation(
+            item=item, operation_type=_DynamoDbPutOperation
         )
+        self._session.add_write_operation(operation=operation)
+        self._session.identity_map.add(self._table_name, operation.id, item)
 
     def update(self, item: E) -> None:
-        self._session.add_write_operation(
-            operation=self._build_write_operation(
-                item=item, operation_type=_DynamoDbUpdateOperation
-            )
+        """The update is only applied if the item stored still has the version
+        of the item provided. Otherwise the commit raises VersionConflictError.
+        For domain aggregates only the fields changed since they were loaded
+        are written (all of them if no change was tracked)"""
+        operation = self._build_write_operation(
+            item=item,
+            operation_type=_DynamoDbUpdateOperation,
+            expected_version=item.version,
+            fields=self._update_fields(item),
         )
+        self._session.add_write_operation(operation=operation)
+        self._session.identity_map.add(self._table_name, operation.id, item)
+
+    def update_many(self, items: List[E]) -> None:
+        """update of each item, e.g. the aggregates changed by a bulk transition.
+        The items with the same fields to update (all of them, after a bulk
+        transition) are encoded together. Use it within uow.batch() when they
+        exceed a single transaction"""
+        items_by_fields: Dict[Optional[FrozenSet[str]], List[E]] = {}
+        for item in items:
+            items_by_fields.setdefault(self._update_fields(item), []).append(item)
+        for fields, same_fields_items in items_by_fields.items():
+            records = self._codec.encode_many(same_fields_items, fields=fields)
+            for item, record in zip(same_fields_items, records):
+                operation = self._build_write_operation(
+                    item=item,
+                    operation_type=_DynamoDbUpdateOperation,
+                    expected_version=item.version,
+                    fields=fields,
+                    record_serialized=record,
+                )
+                self._session.add_write_operation(operation=operation)
+                self._session.identity_map.add(self._table_name, operation.id, item)
+
+    @staticmethod
+    def _update_fields(item: E) -> Optional[FrozenSet[str]]:
+        """Fields written by the update of the item, None for all of them"""
+        entity: base_types.RootEntity = item
+        dirty_fields: FrozenSet[str] = (
+            entity.dirty_fields
+            if isinstance(entity, base_types.DomainAggregate)
+            else frozenset()
+        )
+        return dirty_fields | {"version"} if dirty_fields else None
 
     def _build_write_operation(
         self,
         item: E,
         operation_type: Type["_DynamoDbWriteOperation"],
+        expected_version: Optional[int] = None,
+        fields: Optional[AbstractSet[str]] = None,
+        record_serialized: Optional[Dict[str, Any]] = None,
     ) -> "_DynamoDbWriteOperation":
-        # In case of error we don't update the real item in memory
-        item_to_save = item.model_copy()
-        item_to_save._increase_version()
-        record_serialized = self._serialize_entity(item_to_save)
-        record_serialized[self._key_name] = item_to_save.id._key()
+        # In case of error we don't update the real item in memory. Its version
+        # is synced once the operation is committed: the record is written with
+        # the next version instead of copying the item to increase it
+        new_version = item.version + 1
+        if record_serialized is None:
+            record_serialized = self._serialize_entity(item, fields=fields)
+        if fields is None or "version" in fields:
+            record_serialized["version"] = {"N": str(new_version)}
+        key = item.id._key()
+        record_serialized[self._key_name] = {"S": key}
+        cache = self._cache
+
+        def sync_version() -> None:
+            item.version = new_version
+            if isinstance(item, base_types.DomainAggregate):
+                item.clear_dirty_fields()
+            if cache is not None:
+                cache.invalidate(key)
+
+        def drop_stale_record() -> None:
+            # The item cached is older than the stored one, so the retries of
+            # the conflict must read it again from the table
+            if cache is not None:
+                cache.invalidate(key)
+
         return operation_type(
             table_name=self._table_name,
             key_name=self._key_name,
-            entity_dict=record_serialized,
+            item_serialized=record_serialized,
+            expected_version=expected_version,
+            on_committed=sync_version,
+            on_conflict=drop_stale_record,
         )
 
     def get_by_id(self, id: I) -> E:
-        item = self._session.client.get_item(
-            TableName=self._table_name, Key={self._key_name: {"S": id._key()}}
-        ).get("Item")
-        if item:
-            item_deserialized = self._deserializer_item(dynamodb_record=item)
-            print(f"Item result: {item_deserialized}")
-            return self._entity_type.model_validate(item_deserialized)
-        raise ValueError(f"Item with id {id._key()} not found")
+        """The items read or written in the same unit of work are returned from
+        its identity map, so repeated reads return the same instance"""
+        key = id._key()
+        entity = self._session.identity_map.get(self._table_name, key)
+        if entity is identity_map.MISSING:
+            entity = None
+            item = self._cache.get(key) if self._cache is not None else None
+            if item is None:
+                item = self._session.client.get_item(
+                    TableName=self._table_name, Key={self._key_name: {"S": key}}
+                ).get("Item")
+                if item and self._cache is not None:
+                    self._cache.put(key, item)
+            if item:
+                item_deserialized = self._deserializer_item(dynamodb_record=item)
+                print(f"Item result: {item_deserialized}")
+                entity = self._entity_type.model_validate(item_deserialized)
+            self._session.identity_map.add(self._table_name, key, entity)
+        if entity is None:
+            raise ValueError(f"Item with id {key} not found")
+        return entity  # type: ignore
 
     def find_by_id(self, id: I) -> Optional[E]:
         try:
@@ -88,21 +221,613 @@ class DynamoDbRepository(commons.Repository[E]):
         except ValueError:
             return None
 
-    def get_all(self) -> Iterator[E]:
+    def get_partial_by_id(self, id: I, fields: Sequence[str]) -> pydantic.BaseModel:
+        """Return only the fields requested, as an immutable partial model of the
+        entity (see partial_model). Only those attributes are read from DynamoDB.
+        The partial items don't go through the identity map or the cache"""
+        partial = self.find_partial_by_id(id=id, fields=fields)
+        if partial is None:
+            raise ValueError(f"Item with id {id._key()} not found")
+        return partial
+
+    def find_partial_by_id(
+        self, id: I, fields: Sequence[str]
+    ) -> Optional[pydantic.BaseModel]:
+        """Raise ValueError if any of the fields isn't a field of the entity"""
+        partial_type = partial_model(self._entity_type, tuple(fields))
+        item = self._session.client.get_item(
+            TableName=self._table_name,
+            Key={self._key_name: {"S": id._key()}},
+            **projection_params(fields),
+        ).get("Item")
+        if not item:
+            return None
+        return partial_type.model_validate(
+            dynamodb_codec.codec_for(partial_type).decode(item)
+        )
+
+    def get_many(self, ids: List[I]) -> List[E]:
+        """Return the items in the same order of the ids provided.
+        Raise ValueError if any of them doesn't exist"""
+        items = self.find_many(ids=ids)
+        missing_keys = [id._key() for id in ids if id._key() not in items]
+        if missing_keys:
+            raise ValueError(f"Items with ids {missing_keys} not found")
+        return [items[id._key()] for id in ids]
+
+    def find_many(self, ids: List[I]) -> Dict[str, E]:
+        """Return the items found indexed by EntityId._key(). Missing ids are omitted"""
+        items: Dict[str, E] = {}
+        unknown_keys: List[str] = []
+        keys_to_fetch: List[str] = []
+        records: List[Dict[str, Any]] = []
+        for key in dict.fromkeys(id._key() for id in ids):
+            entity = self._session.identity_map.get(self._table_name, key)
+            if entity is not identity_map.MISSING:
+                if entity is not None:
+                    items[key] = entity
+                continue
+            unknown_keys.append(key)
+            record = self._cache.get(key) if self._cache is not None else None
+            if record is None:
+                keys_to_fetch.append(key)
+            else:
+                records.append(record)
+
+        keys_splitted: Iterator[List[str]] = base_types.split_list(
+            input_list=keys_to_fetch, chunk_size=MAX_DYNAMO_DB_BATCH_GET_SIZE
+        )
+        for keys_chunk in keys_splitted:
+            records_fetched = self._batch_get_items(keys=keys_chunk)
+            if self._cache is not None:
+                for record in records_fetched:
+                    self._cache.put(record[self._key_name]["S"], record)
+            records.extend(records_fetched)
+
+        for record in records:
+            item_deserialized = self._deserializer_item(dynamodb_record=record)
+            items[item_deserialized[self._key_name]] = self._entity_type.model_validate(
+                item_deserialized
+            )
+        for key in unknown_keys:
+            self._session.identity_map.add(self._table_name, key, items.get(key))
+        return items
+
+    def _batch_get_items(self, keys: List[str]) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        request_items = {
+            self._table_name: {
+                "Keys": [{self._key_name: {"S": key}} for key in keys],
+            }
+        }
+        unprocessed = self._batch_get_request(
+            request_items=request_items, records=records
+        )
+        if unprocessed:
+            raise UnprocessedKeysError(
+                keys_qty=len(unprocessed[self._table_name]["Keys"])
+            )
+        return records
+
+    @retry.on_predicate(
+        "expo",
+        bool,
+        max_tries=BATCH_GET_MAX_TRIES,
+        max_time=BATCH_GET_MAX_TIME,
+        factor=0.05,
+    )
+    def _batch_get_request(
+        self, request_items: Dict[str, Any], records: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        # request_items is replaced in place by the unprocessed keys, so each
+        # retry only asks again for the keys DynamoDB didn't return
+        response = self._session.client.batch_get_item(RequestItems={**request_items})
+        records.extend(response.get("Responses", {}).get(self._table_name, []))
+        unprocessed: Dict[str, Any] = response.get("UnprocessedKeys", {})
+        request_items.clear()
+        request_items.update(unprocessed)
+        return unprocessed
+
+    def query_by(
+        self,
+        field: str,
+        value: Any,
+        sort_key_condition: Optional[SortKeyCondition] = None,
+        page_size: int = DEFAULT_QUERY_PAGE_SIZE,
+        scan_forward: bool = True,
+    ) -> Iterator[E]:
+        """Query the secondary index whose partition key is field, page by page.
+        The index must project all the attributes of the entity"""
+        for items in self._query_pages(
+            page_size=page_size,
+            query_params=self._query_params(
+                field=field,
+                value=value,
+                sort_key_condition=sort_key_condition,
+                scan_forward=scan_forward,
+            ),
+        ):
+            for record in self._deserializer_page(dynamodb_records=items):
+                key = record[self._key_name]
+                entity = self._session.identity_map.get(self._table_name, key)
+                if entity is identity_map.MISSING or entity is None:
+                    entity = self._entity_type.model_validate(record)
+                    self._session.identity_map.add(self._table_name, key, entity)
+                yield entity
+
+    def _query_params(
+        self,
+        field: str,
+        value: Any,
+        sort_key_condition: Optional[SortKeyCondition],
+        scan_forward: bool,
+    ) -> Dict[str, Any]:
+        index = self._indexes.get(field)
+        if index is None:
+            raise ValueError(
+                f"{self._entity_type.__name__} has no secondary index on {field}"
+            )
+        attribute_names = {"#pk": index.partition_key}
+        attribute_values = {":pk": dynamodb_codec.encode_any(value)}
+        key_condition = "#pk = :pk"
+        if sort_key_condition:
+            if index.sort_key is None:
+                raise ValueError(f"Index {index.name} has no sort key")
+            attribute_names["#sk"] = index.sort_key
+            for i, sort_value in enumerate(sort_key_condition.values):
+                attribute_values[f":sk{i}"] = dynamodb_codec.encode_any(sort_value)
+            operator = sort_key_condition.operator
+            if operator == "between":
+                key_condition += " AND #sk BETWEEN :sk0 AND :sk1"
+            elif operator == "begins_with":
+                key_condition += " AND begins_with(#sk, :sk0)"
+            else:
+                key_condition += f" AND #sk {operator} :sk0"
+        return {
+            "IndexName": index.name,
+            "KeyConditionExpression": key_condition,
+            "ExpressionAttributeNames": attribute_names,
+            "ExpressionAttributeValues": attribute_values,
+            "ScanIndexForward": scan_forward,
+        }
+
+    def query_page(
+        self,
+        field: str,
+        value: Any,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_QUERY_PAGE_SIZE,
+        sort_key_condition: Optional[SortKeyCondition] = None,
+        scan_forward: bool = True,
+    ) -> commons.Page:
+        """Return a page of query_by. Pass the cursor of the page to get the next one"""
+        return next(
+            self.query_pages(
+                field=field,
+                value=value,
+                cursor=cursor,
+                page_size=page_size,
+                sort_key_condition=sort_key_condition,
+                scan_forward=scan_forward,
+            )
+        )
+
+    def query_pages(
+        self,
+        field: str,
+        value: Any,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_QUERY_PAGE_SIZE,
+        sort_key_condition: Optional[SortKeyCondition] = None,
+        scan_forward: bool = True,
+        prefetch: bool = False,
+    ) -> Iterator[commons.Page]:
+        """Same as query_page, for all the pages from the cursor. With prefetch the
+        next page is requested while the current one is processed"""
         params = {
             "TableName": self._table_name,
-            "Limit": MAX_DYNAMO_DB_BATCH_SIZE_PER_TRX,
+            "Limit": page_size,
+            **self._query_params(
+                field=field,
+                value=value,
+                sort_key_condition=sort_key_condition,
+                scan_forward=scan_forward,
+            ),
         }
+        return self._cursor_pages(
+            operation="query", params=params, cursor=cursor, prefetch=prefetch
+        )
+
+    def _query_pages(
+        self, page_size: int, query_params: Dict[str, Any]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        params = {"TableName": self._table_name, "Limit": page_size, **query_params}
+        return self._raw_pages(operation="query", params=params)
+
+    def get_page(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segment: Optional[int] = None,
+        total_segments: Optional[int] = None,
+    ) -> commons.Page:
+        """Return a page of the table scan. Pass the cursor of the page to get the
+        next one, e.g. in the next invocation. With segment/total_segments each
+        segment of a parallel scan is paginated independently"""
+        return next(
+            self.get_pages(
+                cursor=cursor,
+                page_size=page_size,
+                segment=segment,
+                total_segments=total_segments,
+            )
+        )
+
+    def get_pages(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segment: Optional[int] = None,
+        total_segments: Optional[int] = None,
+        prefetch: bool = False,
+    ) -> Iterator[commons.Page]:
+        """Same as get_page, for all the pages from the cursor. With prefetch the
+        next page is requested while the current one is processed"""
+        params: Dict[str, Any] = {"TableName": self._table_name, "Limit": page_size}
+        if total_segments:
+            params["Segment"] = segment
+            params["TotalSegments"] = total_segments
+        return self._cursor_pages(
+            operation="scan", params=params, cursor=cursor, prefetch=prefetch
+        )
+
+    def _cursor_pages(
+        self,
+        operation: str,
+        params: Dict[str, Any],
+        cursor: Optional[str],
+        prefetch: bool,
+    ) -> Iterator[commons.Page]:
+        start_key = decode_cursor(cursor=cursor, params=params) if cursor else None
+        if not prefetch:
+            while True:
+                items, start_key = self._request_page(operation, params, start_key)
+                yield self._build_page(items=items, params=params, last_key=start_key)
+                if not start_key:
+                    return
+
+        from concurrent import futures
+
+        executor = futures.ThreadPoolExecutor(max_workers=1)
+        try:
+            next_page = executor.submit(
+                self._request_page, operation, params, start_key
+            )
+            while True:
+                items, start_key = next_page.result()
+                if start_key:
+                    next_page = executor.submit(
+                        self._request_page, operation, params, start_key
+                    )
+                yield self._build_page(items=items, params=params, last_key=start_key)
+                if not start_key:
+                    return
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _build_page(
+        self,
+        items: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        last_key: Optional[Dict[str, Any]],
+    ) -> commons.Page:
+        return commons.Page(
+            items=[
+                self._entity_type.model_validate(record)
+                for record in self._deserializer_page(dynamodb_records=items)
+            ],
+            cursor=encode_cursor(last_key=last_key, params=params)
+            if last_key
+            else None,
+        )
+
+    def _request_page(
+        self,
+        operation: str,
+        params: Dict[str, Any],
+        start_key: Optional[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        request = {**params, "ExclusiveStartKey": start_key} if start_key else params
+        response = getattr(self._session.client, operation)(**request)
+        return response.get("Items", []), response.get("LastEvaluatedKey")
+
+    def _raw_pages(
+        self, operation: str, params: Dict[str, Any]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        start_key = None
         while True:
-            response = self._session.client.scan(**params)
-            items = response.get("Items", [])
+            items, start_key = self._request_page(operation, params, start_key)
+            yield items
+            if not start_key:
+                return
+
+    def get_all(
+        self,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segments: int = 1,
+        max_workers: Optional[int] = None,
+        max_queued_pages: int = DEFAULT_SCAN_MAX_QUEUED_PAGES,
+    ) -> Iterator[E]:
+        """Scan the whole table. With segments > 1 the table is scanned in parallel
+        segments and the pages are streamed through a bounded queue"""
+        for record in self.get_all_raw(
+            page_size=page_size,
+            segments=segments,
+            max_workers=max_workers,
+            max_queued_pages=max_queued_pages,
+        ):
+            yield self._entity_type.model_validate(record)
+
+    def get_all_partial(
+        self,
+        fields: Sequence[str],
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segments: int = 1,
+        max_workers: Optional[int] = None,
+        max_queued_pages: int = DEFAULT_SCAN_MAX_QUEUED_PAGES,
+    ) -> Iterator[pydantic.BaseModel]:
+        """Same as get_all but only the fields requested are read and returned,
+        as partial models of the entity"""
+        partial_type = partial_model(self._entity_type, tuple(fields))
+        decode = dynamodb_codec.codec_for(partial_type).decode
+        pages = self._scan_pages(
+            page_size=page_size,
+            segments=segments,
+            max_workers=max_workers,
+            max_queued_pages=max_queued_pages,
+            scan_params=projection_params(fields),
+        )
+        for items in pages:
             for item in items:
-                yield self._entity_type.model_validate(item)
+                yield partial_type.model_validate(decode(item))
+
+    def get_all_raw(
+        self,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segments: int = 1,
+        max_workers: Optional[int] = None,
+        max_queued_pages: int = DEFAULT_SCAN_MAX_QUEUED_PAGES,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Same as get_all but yield the deserialized records as plain dicts,
+        skipping the entity validation. Intended for bulk export jobs.
+        With fields, only those attributes are read"""
+        pages = self._scan_pages(
+            page_size=page_size,
+            segments=segments,
+            max_workers=max_workers,
+            max_queued_pages=max_queued_pages,
+            scan_params=projection_params(fields) if fields else None,
+        )
+        for items in pages:
+            yield from self._deserializer_page(dynamodb_records=items)
+
+    def _scan_pages(
+        self,
+        page_size: int,
+        segments: int,
+        max_workers: Optional[int],
+        max_queued_pages: int,
+        scan_params: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        if segments <= 1:
+            return self._scan_segment_pages(
+                page_size=page_size, scan_params=scan_params
+            )
+        return self._parallel_scan_pages(
+            page_size=page_size,
+            segments=segments,
+            max_workers=max_workers or segments,
+            max_queued_pages=max_queued_pages,
+            scan_params=scan_params,
+        )
+
+    def _scan_segment_pages(
+        self,
+        page_size: int,
+        segment: Optional[int] = None,
+        total_segments: Optional[int] = None,
+        scan_params: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        params: Dict[str, Any] = {
+            "TableName": self._table_name,
+            "Limit": page_size,
+            **(scan_params or {}),
+        }
+        if total_segments:
+            params["Segment"] = segment
+            params["TotalSegments"] = total_segments
+        return self._raw_pages(operation="scan", params=params)
+
+    def _parallel_scan_pages(
+        self,
+        page_size: int,
+        segments: int,
+        max_workers: int,
+        max_queued_pages: int,
+        scan_params: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        pages: "queue.Queue[Any]" = queue.Queue(maxsize=max_queued_pages)
+        stop_event = threading.Event()
+
+        def put(page: Any) -> bool:
+            # Workers never block forever on a full queue. If the consumer
+            # stops iterating they give up on the next timeout
+            while not stop_event.is_set():
+                try:
+                    pages.put(page, timeout=_SCAN_QUEUE_PUT_TIMEOUT)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def scan_segment(segment: int) -> None:
+            try:
+                for page in self._scan_segment_pages(
+                    page_size=page_size,
+                    segment=segment,
+                    total_segments=segments,
+                    scan_params=scan_params,
+                ):
+                    if not put(page):
+                        return
+                put(_SEGMENT_COMPLETED)
+            except Exception as ex:
+                put(ex)
+
+        from concurrent import futures
+
+        executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            for segment in range(segments):
+                executor.submit(scan_segment, segment)
+            segments_pending = segments
+            while segments_pending:
+                page = pages.get()
+                if page is _SEGMENT_COMPLETED:
+                    segments_pending -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def encode_cursor(last_key: Dict[str, Any], params: Dict[str, Any]) -> str:
+    """Return the LastEvaluatedKey as an url safe token. It records the table,
+    index, segment and key condition (a digest of it) it belongs to, so it
+    can't resume a different request"""
+    cursor = {"k": last_key, "r": _cursor_request(params)}
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_cursor(cursor: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        last_key, request = decoded["k"], decoded["r"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if request != _cursor_request(params):
+        raise InvalidCursorError("The cursor belongs to a different request")
+    return last_key  # type: ignore
+
+
+def _cursor_request(params: Dict[str, Any]) -> List[Any]:
+    request = [
+        params["TableName"],
+        params.get("IndexName"),
+        params.get("Segment"),
+        params.get("TotalSegments"),
+    ]
+    if "KeyConditionExpression" in params:
+        import hashlib
+
+        key_condition = json.dumps(
+            [
+                params["KeyConditionExpression"],
+                params.get("ExpressionAttributeNames"),
+                params.get("ExpressionAttributeValues"),
+                params.get("ScanIndexForward"),
+            ],
+            sort_keys=True,
+        )
+        request.append(hashlib.sha256(key_condition.encode()).hexdigest()[:16])
+    return request
+
+
+@functools.lru_cache(maxsize=None)
+def partial_model(
+    entity_type: Type[pydantic.BaseModel], fields: Tuple[str, ...]
+) -> Type[pydantic.BaseModel]:
+    """Return an immutable model with only the fields requested of the entity,
+    keeping their types and defaults. Models are generated once per subset"""
+    unknown_fields = [name for name in fields if name not in entity_type.model_fields]
+    if unknown_fields:
+        raise ValueError(f"{entity_type.__name__} has no fields {unknown_fields}")
+    return pydantic.create_model(  # type: ignore
+        f"{entity_type.__name__}Partial",
+        __base__=base_types.ValueObject,
+        **{
+            name: (entity_type.model_fields[name].annotation, field)
+            for name, field in entity_type.model_fields.items()
+            if name in fields
+        },
+    )
+
+
+def projection_params(fields: Sequence[str]) -> Dict[str, Any]:
+    """Return the ProjectionExpression (and its attribute names) of the fields"""
+    attribute_names = {f"#p{i}": name for i, name in enumerate(fields)}
+    return {
+        "ProjectionExpression": ", ".join(attribute_names),
+        "ExpressionAttributeNames": attribute_names,
+    }
+
+
+class AsyncDynamoDbRepository(commons.AsyncRepository[E]):
+    """Awaitable facade of DynamoDbRepository. The blocking calls run in worker
+    threads, so several reads can be awaited concurrently"""
+
+    def __init__(self, repository: DynamoDbRepository[E]) -> None:
+        self._repository = repository
+
+    def put(self, item: E) -> None:
+        self._repository.put(item=item)
+
+    def update(self, item: E) -> None:
+        self._repository.update(item=item)
+
+    def update_many(self, items: List[E]) -> None:
+        self._repository.update_many(items=items)
+
+    async def get_by_id(self, id: I) -> E:
+        import asyncio
+
+        return await asyncio.to_thread(
+            functools.partial(self._repository.get_by_id, id=id)
+        )
+
+    async def find_by_id(self, id: I) -> Optional[E]:
+        import asyncio
+
+        return await asyncio.to_thread(
+            functools.partial(self._repository.find_by_id, id=id)
+        )
+
+    async def get_many(self, ids: List[I]) -> List[E]:
+        items = await self.find_many(ids=ids)
+        missing_keys = [id._key() for id in ids if id._key() not in items]
+        if missing_keys:
+            raise ValueError(f"Items with ids {missing_keys} not found")
+        return [items[id._key()] for id in ids]
+
+    async def find_many(self, ids: List[I]) -> Dict[str, E]:
+        """Each BatchGetItem request of the ids runs concurrently"""
+        import asyncio
+
+        unique_ids = list({id._key(): id for id in ids}.values())
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._repository.find_many, ids=ids_chunk)
+                for ids_chunk in base_types.split_list(
+                    input_list=unique_ids, chunk_size=MAX_DYNAMO_DB_BATCH_GET_SIZE
+                )
+            )
+        )
+        return {key: item for result in results for key, item in result.items()}
 
-            if "LastEvaluatedKey" in response:
-                params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
-            else:
-                break
 
 ############## DYNAMO DB WRITE OPERATION IN DB COMPONENTS ####################################################
 class DuplicateWriteOperationsError(Exception):
@@ -125,14 +850,26 @@ class TransactionFailedError(Exception):
     ...
 
 
-class _DynamoDbWriteOperation(commons.WriteOperation):
+class _DynamoDbWriteOperation(commons.WriteOperation, abc.ABC):
+    """The request payload is built once and cached, so retries reuse it.
+    It must be treated as immutable"""
+
     def __init__(
-        self, table_name: str, key_name: str, entity_dict: Dict[str, Any]
+        self,
+        table_name: str,
+        key_name: str,
+        item_serialized: Dict[str, Any],
+        expected_version: Optional[int] = None,
+        on_committed: Optional[Callable[[], None]] = None,
+        on_conflict: Optional[Callable[[], None]] = None,
     ) -> None:
         self._table_name = table_name
         self._key_name = key_name
-        self._id = entity_dict.get(key_name)
-        self._entity = entity_dict
+        self._id = item_serialized[key_name]["S"]
+        self._item = item_serialized
+        self._expected_version = expected_version
+        self._on_committed = on_committed
+        self._on_conflict = on_conflict
 
     @property
     def id(self) -> str:
@@ -146,27 +883,42 @@ class _DynamoDbWriteOperation(commons.WriteOperation):
     def table_name(self) -> str:
         return self._table_name
 
-    @property
+    @functools.cached_property
     def entity_serialized(self) -> Dict[str, Any]:
-        from boto3.dynamodb.types import TypeSerializer
+        return self._build_request()
 
-        serializer = TypeSerializer()
-        dynamodb_dict = {k: serializer.serialize(v) for k, v in self._entity.items()}
-        return dynamodb_dict
+    @functools.cached_property
+    def size(self) -> int:
+        return dynamodb_codec.item_size(self._item)
 
+    @property
+    def bulk_request(self) -> Dict[str, Any]:
+        raise WrongProcessTransactionTypeSelectedError(
+            f"{type(self).__name__} is not supported in bulk writes"
+        )
 
-class _DynamoDbPutOperation(_DynamoDbWriteOperation):
-    def __init__(
-        self, table_name: str, key_name: str, entity_dict: Dict[str, Any]
-    ) -> None:
-        super().__init__(table_name, key_name, entity_dict)
+    def committed(self) -> None:
+        if self._on_committed:
+            self._on_committed()
 
+    def conflicted(self) -> None:
+        if self._on_conflict:
+            self._on_conflict()
+
+    @abc.abstractmethod
+    def _build_request(self) -> Dict[str, Any]:
+        ...
+
+
+class _DynamoDbPutOperation(_DynamoDbWriteOperation):
     @property
-    def entity_serialized(self) -> Dict[str, Any]:
-        entity_dict = super().entity_serialized
+    def bulk_request(self) -> Dict[str, Any]:
+        return {"PutRequest": {"Item": self._item}}
+
+    def _build_request(self) -> Dict[str, Any]:
         return {
             "Put": {
-                "Item": entity_dict,
+                "Item": self._item,
                 "TableName": self.table_name,
                 "ConditionExpression": "attribute_not_exists(#id)",
                 "ExpressionAttributeNames": {"#id": self.key_name},
@@ -176,24 +928,25 @@ class _DynamoDbPutOperation(_DynamoDbWriteOperation):
 
 
 class _DynamoDbUpdateOperation(_DynamoDbWriteOperation):
-    def __init__(
-        self, table_name: str, key_name: str, entity_dict: Dict[str, Any]
-    ) -> None:
-        super().__init__(table_name, key_name, entity_dict)
-
-    @property
-    def entity_serialized(self) -> Dict[str, Any]:
-        entity_dict = super().entity_serialized
-        key_value = entity_dict.pop(self.key_name)
+    def _build_request(self) -> Dict[str, Any]:
+        attribute_names: Dict[str, str] = {}
+        attribute_values: Dict[str, Any] = {}
         update_expression_parts = []
-        for attr_name in entity_dict:
-            update_expression_parts.append(f"#{attr_name} = :{attr_name}")
-        update_expression = "SET " + ", ".join(update_expression_parts)
-        return {
-            "Update": {
-                "TableName": self.table_name,
-                "Key": key_value,
-                "UpdateExpression": update_expression,
-                "ExpressionAttributeValues": entity_dict,
-            }
+        for i, (attr_name, attr_value) in enumerate(self._item.items()):
+            if attr_name == self.key_name:
+                continue
+            attribute_names[f"#a{i}"] = attr_name
+            attribute_values[f":a{i}"] = attr_value
+            update_expression_parts.append(f"#a{i} = :a{i}")
+        request = {
+            "TableName": self.table_name,
+            "Key": {self.key_name: self._item[self.key_name]},
+            "UpdateExpression": "SET " + ", ".join(update_expression_parts),
+            "ExpressionAttributeNames": attribute_names,
+            "ExpressionAttributeValues": attribute_values,
         }
+        if self._expected_version is not None:
+            attribute_names["#version"] = "version"
+            attribute_values[":expected_version"] = {"N": str(self._expected_version)}
+            request["ConditionExpression"] = "#version = :expected_version"
+        return {"Update": request}
@@ -0,0 +1,168 @@
+import json
+import inspect
+from typing import Final, Generic, List, Optional, Sequence, Type, TypeVar
+from src.shared import base_types
+from src.shared.adapters.persistence import commons, dynamodb_codec
+from src.shared.adapters.persistence.dynamodb_repository import (
+    DynamoDbRepository,
+    _DynamoDbPutOperation,
+    _DynamoDbUpdateOperation,
+)
+
+#########################################################################################
+#           EVENT SOURCED REPOSITORY                                                    #
+#########################################################################################
+# The events of each aggregate are appended to the events table (one item per
+# event, key "<aggregate key>#<sequence>") and the aggregate version is the
+# sequence of its last event. Every snapshot_every events the state of the
+# aggregate is stored in the snapshots table, in the same transaction.
+# An aggregate is loaded from its snapshot plus the events after it, which are
+# at most snapshot_every, so the load cost doesn't depend on the history length.
+# Appending an event that already exists fails the transaction
+# (VersionConflictError), so concurrent writers can't fork the stream.
+
+A = TypeVar("A", bound=base_types.EventSourcedAggregate)
+
+
+class AggregateNotFoundError(ValueError):
+    ...
+
+
+class StoredEventId(base_types.EntityId):
+    stream_id: str
+    sequence: int
+
+
+class StoredEvent(base_types.Entity):
+    id: StoredEventId
+    event_type: str
+    payload: str
+
+
+class EventSourcedRepository(Generic[A]):
+    def __init__(
+        self,
+        session: commons.SessionDB,
+        events_table_name: str,
+        snapshots_table_name: str,
+        entity_type: Type[A],
+        event_types: Sequence[Type[base_types.DomainEvent]],
+        snapshot_every: Optional[int] = None,
+    ) -> None:
+        """snapshot_every: events between snapshots. By default the one of the
+        entity type (EventSourcedAggregate.snapshot_every)"""
+        if inspect.isabstract(entity_type):
+            raise TypeError(
+                f"{entity_type.__name__} must implement from_event and apply to be rebuilt from its events"
+            )
+        self._session = session
+        self._events_table_name = events_table_name
+        self._events = DynamoDbRepository(
+            session=session, table_name=events_table_name, entity_type=StoredEvent  # type: ignore
+        )
+        self._events_codec = dynamodb_codec.codec_for(StoredEvent)
+        self._snapshots_table_name = snapshots_table_name
+        self._key_name: Final = "id._key"
+        self._entity_type = entity_type
+        self._codec = dynamodb_codec.codec_for(entity_type)
+        self._event_types = {
+            event_type.__name__: event_type for event_type in event_types
+        }
+        self._snapshot_every = snapshot_every or entity_type.snapshot_every
+
+    def save(self, item: A, events: List[base_types.DomainEvent]) -> None:
+        """Append the events (e.g. the ones pulled from the aggregate) to its
+        stream. item must have the state after applying them"""
+        if not events:
+            return
+        stream_id = item.id._key()
+        new_version = item.version + len(events)
+
+        def sync_version() -> None:
+            item.version = new_version
+            item.clear_dirty_fields()
+
+        for sequence, event in enumerate(events, start=item.version + 1):
+            stored_event = StoredEvent(
+                id=StoredEventId(stream_id=stream_id, sequence=sequence),
+                event_type=type(event).__name__,
+                payload=base_types.encode_event(
+                    base_types.validate_event(type(event), event)
+                ),
+            )
+            record_serialized = self._events_codec.encode(stored_event)
+            record_serialized[self._key_name] = {"S": stored_event.id._key()}
+            self._session.add_write_operation(
+                _DynamoDbPutOperation(
+                    table_name=self._events_table_name,
+                    key_name=self._key_name,
+                    item_serialized=record_serialized,
+                    on_committed=sync_version if sequence == new_version else None,
+                )
+            )
+
+        if new_version // self._snapshot_every > item.version // self._snapshot_every:
+            self._session.add_write_operation(
+                self._snapshot_operation(item=item, version=new_version)
+            )
+
+    def _snapshot_operation(self, item: A, version: int) -> commons.WriteOperation:
+        snapshot = item.model_copy()
+        snapshot.version = version
+        record_serialized = self._codec.encode(snapshot)
+        record_serialized[self._key_name] = {"S": item.id._key()}
+        # Unconditional upsert: the events appended in the same transaction
+        # already guard against concurrent writers
+        return _DynamoDbUpdateOperation(
+            table_name=self._snapshots_table_name,
+            key_name=self._key_name,
+            item_serialized=record_serialized,
+        )
+
+    def get_by_id(self, id: base_types.EntityId) -> A:
+        stream_id = id._key()
+        record = self._session.client.get_item(
+            TableName=self._snapshots_table_name,
+            Key={self._key_name: {"S": stream_id}},
+        ).get("Item")
+        item: Optional[A] = (
+            self._entity_type.model_validate(self._codec.decode(record))
+            if record
+            else None
+        )
+        version = item.version if item else 0
+        while True:
+            window = range(version + 1, version + self._snapshot_every + 1)
+            stored_events = self._events.find_many(
+                ids=[StoredEventId(stream_id=stream_id, sequence=s) for s in window]
+            )
+            for sequence in window:
+                stored_event = stored_events.get(f"{stream_id}#{sequence}")
+                if stored_event is None:
+                    break
+                event = self._deserialize_event(stored_event)
+                if item is None:
+                    item = self._entity_type.from_event(event)
+                else:
+                    item.apply(event)
+                version = sequence
+            if len(stored_events) < len(window):
+                break
+
+        if item is None:
+            raise AggregateNotFoundError(f"Item with id {stream_id} not found")
+        item.version = version
+        item.clear_dirty_fields()
+        return item
+
+    def find_by_id(self, id: base_types.EntityId) -> Optional[A]:
+        try:
+            return self.get_by_id(id=id)
+        except AggregateNotFoundError:
+            return None
+
+    def _deserialize_event(self, stored_event: StoredEvent) -> base_types.DomainEvent:
+        event_type = self._event_types.get(stored_event.event_type)
+        if event_type is None:
+            raise ValueError(f"Event type {stored_event.event_type} is not registered")
+        return base_types.validate_event(event_type, json.loads(stored_event.payload))
@@ -0,0 +1,41 @@
+import threading
+from typing import Any, Dict, Final, Optional, Tuple
+
+#########################################################################################
+#           IDENTITY MAP                                                                #
+#########################################################################################
+# Items loaded or written through a session, indexed by table and key. Repeated
+# reads of the same key return the same instance (or None if it didn't exist)
+# without a round trip. The unit of work clears it on commit and rollback.
+
+MISSING: Final = object()
+
+
+class IdentityMap:
+    def __init__(self) -> None:
+        self._items: Dict[Tuple[str, str], Optional[Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, table_name: str, key: str) -> Optional[Any]:
+        """Return the item registered, None if it is known that it doesn't
+        exist or MISSING if the key is unknown"""
+        with self._lock:
+            item = self._items.get((table_name, key), MISSING)
+            if item is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return item
+
+    def add(self, table_name: str, key: str, item: Optional[Any]) -> None:
+        with self._lock:
+            self._items[(table_name, key)] = item
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,115 @@
+import time
+import threading
+import collections
+from typing import Any, Dict, Final, Optional, Tuple, Type
+from src.shared.adapters.persistence import dynamodb_codec
+
+#########################################################################################
+#           ITEM CACHE                                                                  #
+#########################################################################################
+# Process level (Lambda container) cache of DynamoDB items, shared by the warm
+# invocations. Items are kept as DynamoDB records, so each read validates a new
+# instance that the caller can modify. Entries expire after the TTL and the
+# least recently used ones are evicted beyond max_entries or max_bytes.
+# The writes committed by the process invalidate their entries. The writes
+# made by other containers are only seen once the TTL expires, so the TTL is
+# the maximum staleness of a read.
+
+DEFAULT_CACHE_MAX_ENTRIES: Final = 1000
+DEFAULT_CACHE_MAX_BYTES: Final = 16 * 1024 * 1024
+
+
+class ItemCache:
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        # key -> (expires at, record, record size)
+        self._entries: "collections.OrderedDict[str, Tuple[float, Dict[str, Any], int]]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, record: Dict[str, Any]) -> None:
+        size = dynamodb_codec.item_size(record)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, record, size)
+            self.size_bytes += size
+            while (
+                len(self._entries) > self._max_entries
+                or self.size_bytes > self._max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_caches: Dict[Type[Any], ItemCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(
+    entity_type: Type[Any],
+    ttl_seconds: float,
+    max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+    max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+) -> ItemCache:
+    """Return the cache of the entity type, created on the first call"""
+    cache = _caches.get(entity_type)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(
+                entity_type,
+                ItemCache(
+                    ttl_seconds=ttl_seconds,
+                    max_entries=max_entries,
+                    max_bytes=max_bytes,
+                ),
+            )
+    return cache
+
+
+def clear() -> None:
+    with _caches_lock:
+        _caches.clear()
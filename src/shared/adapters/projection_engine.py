@@ -0,0 +1,192 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
+from src.shared import base_types, logging
+from src.shared.adapters import unit_of_work
+from src.shared.adapters.persistence import dynamodb_codec
+from src.shared.adapters.persistence.dynamodb_repository import DynamoDbRepository
+
+_LOGGER = logging.get_lambda_logger()
+
+#########################################################################################
+#           PROJECTION ENGINE                                                           #
+#########################################################################################
+# Build read models (base_types.Projection) from the DynamoDB stream of an
+# aggregate table. Each record is turned into a Change (old/new images) and
+# passed to the projectors registered, which update the read models through
+# ReadModels. The records are processed in order, in chunks: the read models
+# touched by a chunk are committed in a single transaction, so a chunk is
+# applied completely or not at all. When a chunk fails, its first record is
+# reported in batchItemFailures and Lambda resumes the shard from it.
+# The read models aren't idempotent (e.g. counters), so the last sequence
+# number applied of each source item is stored in a checkpoint, in the same
+# transaction. The changes of an item come from a single shard in order, so
+# the ones at or below its checkpoint were already applied and are skipped
+# when Lambda delivers them again (e.g. after a timeout).
+
+DEFAULT_RECORDS_PER_COMMIT: Final = 25
+
+P = TypeVar("P", bound=base_types.Projection)
+
+
+class Change(base_types.ValueObject):
+    event_name: str
+    sequence_number: str
+    source_key: str
+    old: Optional[Dict[str, Any]] = None
+    new: Optional[Dict[str, Any]] = None
+
+    @property
+    def changed_fields(self) -> FrozenSet[str]:
+        old, new = self.old or {}, self.new or {}
+        return frozenset(
+            name for name in old.keys() | new.keys() if old.get(name) != new.get(name)
+        )
+
+    @staticmethod
+    def from_stream_record(record: Dict[str, Any]) -> "Change":
+        stream_record = record["dynamodb"]
+        keys = _decode_image(stream_record["Keys"]) or {}
+        return Change(
+            event_name=record["eventName"],
+            sequence_number=stream_record["SequenceNumber"],
+            source_key="#".join(str(keys[name]) for name in sorted(keys)),
+            old=_decode_image(stream_record.get("OldImage")),
+            new=_decode_image(stream_record.get("NewImage")),
+        )
+
+
+def _decode_image(image: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if image is None:
+        return None
+    return {name: dynamodb_codec.decode_any(value) for name, value in image.items()}
+
+
+class ReadModels:
+    """Read models touched by a chunk of changes. Each one is loaded once and
+    written (put if new, update if changed) when the chunk is committed"""
+
+    def __init__(self) -> None:
+        self._pending: Dict[
+            Tuple[Type[Any], str],
+            Tuple[DynamoDbRepository, base_types.Projection, bool],
+        ] = {}
+
+    def get(
+        self,
+        repository: DynamoDbRepository,
+        id: base_types.EntityId,
+        default: Callable[[], P],
+    ) -> P:
+        key = (repository._entity_type, id._key())
+        if key not in self._pending:
+            projection = repository.find_by_id(id=id)
+            self._pending[key] = (
+                repository,
+                projection or default(),
+                projection is None,
+            )
+        return cast(P, self._pending[key][1])
+
+    def write(self) -> None:
+        for repository, projection, is_new in self._pending.values():
+            if is_new:
+                repository.put(item=projection)
+            elif projection.dirty_fields:
+                repository.update(item=projection)
+
+
+Projector = Callable[[Change, ReadModels], None]
+
+
+class StreamCheckpointId(base_types.EntityId):
+    kind: str = "stream-checkpoint"
+    source_key: str
+
+
+class StreamCheckpoint(base_types.Projection):
+    """Sequence number of the last change of the source item projected"""
+
+    id: StreamCheckpointId
+    sequence_number: str = "0"
+    _events: List[base_types.DomainEvent] = []
+
+    def is_applied(self, change: Change) -> bool:
+        return int(change.sequence_number) <= int(self.sequence_number)
+
+
+class ProjectionEngine:
+    def __init__(
+        self,
+        uow: unit_of_work.UnitOfWork,
+        checkpoints_table_name: str,
+        records_per_commit: int = DEFAULT_RECORDS_PER_COMMIT,
+    ) -> None:
+        """records_per_commit must keep the read models and checkpoints (one per
+        source item) written by a chunk under the transaction limit (100
+        operations). The checkpoints can be stored in the read models table"""
+        self._uow = uow
+        self._checkpoints: DynamoDbRepository = DynamoDbRepository(
+            session=uow.session,
+            table_name=checkpoints_table_name,
+            entity_type=StreamCheckpoint,
+        )
+        self._records_per_commit = records_per_commit
+        self._projectors: List[Projector] = []
+
+    def register(self, projector: Projector) -> Projector:
+        self._projectors.append(projector)
+        return projector
+
+    def handle(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        changes = [Change.from_stream_record(record) for record in event["Records"]]
+        chunks: List[List[Change]] = list(
+            base_types.split_list(
+                input_list=changes, chunk_size=self._records_per_commit
+            )
+        )
+        for chunk in chunks:
+            try:
+                self._project_chunk(changes=chunk)
+            except Exception:
+                _LOGGER.exception(
+                    f"Error projecting changes from {chunk[0].sequence_number}"
+                )
+                return {
+                    "batchItemFailures": [{"itemIdentifier": chunk[0].sequence_number}]
+                }
+        _LOGGER.info(f"Changes projected [{len(changes)}]")
+        return {"batchItemFailures": []}
+
+    @unit_of_work.retry_on_conflict()
+    def _project_chunk(self, changes: List[Change]) -> None:
+        # On a version conflict (another shard updated the same read model) the
+        # read models are loaded again and the chunk is projected from scratch
+        read_models = ReadModels()
+        ids = [StreamCheckpointId(source_key=change.source_key) for change in changes]
+        # Loaded at once. ReadModels gets them from the identity map
+        self._checkpoints.find_many(ids=ids)
+        for change, id in zip(changes, ids):
+            checkpoint = read_models.get(
+                repository=self._checkpoints,
+                id=id,
+                default=lambda: StreamCheckpoint(id=id),
+            )
+            if checkpoint.is_applied(change):
+                _LOGGER.info(f"Change {change.sequence_number} already projected")
+                continue
+            for projector in self._projectors:
+                projector(change, read_models)
+            checkpoint.sequence_number = change.sequence_number
+        with self._uow.transaction():
+            read_models.write()
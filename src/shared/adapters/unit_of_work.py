@@ -1,15 +1,31 @@
 import enum
+import functools
 import contextlib
-import boto3
-import backoff
-from botocore import exceptions as boto3_exceptions
-from typing import Protocol, List, Iterator, Dict, Final
-from src.shared import logging
+from typing import (
+    TYPE_CHECKING,
+    Protocol,
+    List,
+    Iterator,
+    AsyncIterator,
+    AsyncContextManager,
+    ContextManager,
+    Dict,
+    Final,
+    Optional,
+    Callable,
+    Any,
+    TypeVar,
+)
+from src.shared import logging, retry
 from src.shared import base_types
-from src.shared.adapters import event_publisher
+from src.shared.adapters import clients, event_publisher, outbox
 from src.shared.adapters.persistence import commons as persistence_commons
+from src.shared.adapters.persistence import identity_map
 from src.shared.adapters.persistence.commons import WriteOperation
 
+if TYPE_CHECKING:
+    import asyncio
+
 _LOGGER = logging.get_lambda_logger()
 
 
@@ -17,9 +33,16 @@ class UnknownTransactionTypeError(Exception):
     ...
 
 
+class OutboxTransactionTypeError(Exception):
+    """The events of an outbox unit of work are only atomic with the aggregates
+    in SINGLE transactions: BATCH splits them across chunks and BULK doesn't
+    have atomicity at all"""
+
+
 class TransactionType(base_types.NamedEnum):
     SINGLE = enum.auto()
     BATCH = enum.auto()
+    BULK = enum.auto()
     NONE = enum.auto()
 
 
@@ -33,7 +56,11 @@ class UnitOfWork(Protocol):
         ...
 
     @contextlib.contextmanager
-    def batch(self) -> Iterator[None]:
+    def batch(self, max_workers: int = 1) -> Iterator[None]:
+        ...
+
+    @contextlib.contextmanager
+    def bulk(self, max_workers: int = ...) -> Iterator[None]:
         ...
 
     def commit(self) -> None:
@@ -46,64 +73,273 @@ class UnitOfWork(Protocol):
         ...
 
 
+class AsyncUnitOfWork(Protocol):
+    @property
+    def session(self) -> persistence_commons.SessionDB:
+        ...
+
+    def transaction(self) -> AsyncContextManager[None]:
+        ...
+
+    def batch(self, max_workers: int = 1) -> AsyncContextManager[None]:
+        ...
+
+    def bulk(self, max_workers: int = ...) -> AsyncContextManager[None]:
+        ...
+
+    async def commit(self) -> None:
+        ...
+
+    async def rollback(self) -> None:
+        ...
+
+    def publish_events(self, events: List[base_types.DomainEvent]) -> None:
+        ...
+
+
 MAX_DYNAMO_DB_BATCH_SIZE_PER_TRX: Final = 100
+MAX_DYNAMO_DB_TRX_SIZE_BYTES: Final = 4 * 1024 * 1024
+MAX_DYNAMO_DB_BATCH_WRITE_SIZE: Final = 25
+DEFAULT_BULK_MAX_WORKERS: Final = 4
+BATCH_WRITE_MAX_TRIES: Final = 5
+BATCH_WRITE_MAX_TIME: Final = 10
 
 
 class DynamoDbUnitOfWork(UnitOfWork):
-    def __init__(
-        self,
-    ) -> None:
-        self._message_bus_client = event_publisher.EventBridgePublisher()
+    """With an outbox table (argument or OUTBOX_TABLE_NAME) the events are written
+    in the outbox within the same transaction as the aggregates, and the outbox
+    relay publishes them. Only transaction() can publish events in this mode.
+    Otherwise they are published after the commit"""
+
+    def __init__(self, outbox_table_name: Optional[str] = None) -> None:
+        # Created on the first publication: in outbox mode the events are only
+        # converted to entries, which doesn't need the EventBridge client
+        self._message_bus_client: Optional[event_publisher.EventBridgePublisher] = None
         self._session = DefaultDynamoDBSession()
+        self._outbox_table_name = outbox_table_name or outbox.outbox_table_name()
         self._events_to_publish: List[base_types.DomainEvent] = []
         self._transaction_type: TransactionType = TransactionType.NONE
+        self._batch_max_workers = 1
+        self._batch_report: Optional[persistence_commons.BatchWriteReport] = None
 
     @property
     def session(self) -> persistence_commons.SessionDB:
         return self._session
 
+    @property
+    def batch_report(self) -> Optional[persistence_commons.BatchWriteReport]:
+        """Report of the last batch transaction committed"""
+        return self._batch_report
+
     @contextlib.contextmanager
     def transaction(self) -> Iterator[None]:
-        try:
-            _LOGGER.info("Init in single transaction context manager")
-            self._transaction_type = TransactionType.SINGLE
+        with self.transaction_context(transaction_type=TransactionType.SINGLE):
             yield
             self.commit()
-        finally:
-            self._transaction_type = TransactionType.NONE
-            self._events_to_publish.clear()
 
     @contextlib.contextmanager
-    def batch(self) -> Iterator[None]:
-        try:
-            _LOGGER.info("Init in batch transaction context manager")
-            self._transaction_type = TransactionType.BATCH
+    def batch(self, max_workers: int = 1) -> Iterator[None]:
+        """Commit the write operations in chunks of transactions. With max_workers > 1
+        the chunks are committed concurrently"""
+        with self.transaction_context(
+            transaction_type=TransactionType.BATCH, max_workers=max_workers
+        ):
+            yield
+            self.commit()
+
+    @contextlib.contextmanager
+    def bulk(self, max_workers: int = DEFAULT_BULK_MAX_WORKERS) -> Iterator[None]:
+        """Write the put operations through BatchWriteItem, without atomicity
+        across items and without the put conditions. Cheaper than batch() for
+        bulk loads"""
+        with self.transaction_context(
+            transaction_type=TransactionType.BULK, max_workers=max_workers
+        ):
             yield
             self.commit()
+
+    @contextlib.contextmanager
+    def transaction_context(
+        self, transaction_type: TransactionType, max_workers: int = 1
+    ) -> Iterator[None]:
+        """Context of the write operations, without committing them on exit.
+        Everything pending is rolled back if it raises"""
+        try:
+            _LOGGER.info(f"Init in {transaction_type.value} context manager")
+            self._transaction_type = transaction_type
+            self._batch_max_workers = max_workers
+            yield
+        except Exception:
+            # Nothing of a failed context is kept: neither the pending
+            # operations (e.g. built from stale items on a version conflict)
+            # nor the items they left in the identity map
+            self.rollback()
+            raise
         finally:
             self._transaction_type = TransactionType.NONE
+            self._batch_max_workers = 1
             self._events_to_publish.clear()
 
     def commit(self) -> None:
+        self.execute_write_operations()
+        events = self.pull_events()
+        if events:
+            _LOGGER.info("Publishing event domain associated")
+            self.publisher().publish(events=events)
+
+    def execute_write_operations(self) -> None:
+        """Write the operations of the context, without publishing its events"""
+        try:
+            self._write_operations()
+        finally:
+            self._session.identity_map.clear()
+
+    def pull_events(self) -> List[base_types.DomainEvent]:
+        """Return the events pending to publish and remove them"""
+        events = [*self._events_to_publish]
+        self._events_to_publish.clear()
+        return events
+
+    def _write_operations(self) -> None:
+        if self._outbox_table_name:
+            if (
+                self._events_to_publish
+                and self._transaction_type != TransactionType.SINGLE
+            ):
+                raise OutboxTransactionTypeError(
+                    f"Events can't be written in the outbox in a {self._transaction_type.value} transaction"
+                )
+            self._add_events_to_outbox(table_name=self._outbox_table_name)
         if self._transaction_type == TransactionType.SINGLE:
             self._session.execute_in_single_transaction()
         elif self._transaction_type == TransactionType.BATCH:
-            self._session.execute_in_batch_transaction()
+            self._batch_report = self._session.execute_in_batch_transaction(
+                max_workers=self._batch_max_workers
+            )
+        elif self._transaction_type == TransactionType.BULK:
+            self._batch_report = self._session.execute_in_bulk(
+                max_workers=self._batch_max_workers
+            )
         else:
             raise UnknownTransactionTypeError(
-                "Error when try to identify the transaction type. For now we only allow SINGLE and BATCH transaction types"
+                "Error when try to identify the transaction type. For now we only allow SINGLE, BATCH and BULK transaction types"
             )
+
+    def publisher(self) -> event_publisher.EventBridgePublisher:
+        if self._message_bus_client is None:
+            self._message_bus_client = event_publisher.EventBridgePublisher()
+        return self._message_bus_client
+
+    def _add_events_to_outbox(self, table_name: str) -> None:
         if self._events_to_publish:
-            _LOGGER.info("Publishing event domain associated")
-            self._message_bus_client.publish(events=self._events_to_publish)
+            for operation in outbox.event_write_operations(
+                table_name=table_name, events=self._events_to_publish
+            ):
+                self._session.add_write_operation(operation)
+        self._events_to_publish.clear()
 
     def rollback(self) -> None:
-        ...
+        self._session.clear_batches()
+        self._session.identity_map.clear()
+        self._events_to_publish.clear()
 
     def publish_events(self, events: List[base_types.DomainEvent]) -> None:
         self._events_to_publish.extend(events)
 
 
+class AsyncDynamoDbUnitOfWork(AsyncUnitOfWork):
+    """Async unit of work over DynamoDbUnitOfWork. The blocking DynamoDB and
+    EventBridge calls run in worker threads.
+    Used as `async with uow:` the events are published in background after each
+    commit (never before it) and awaited when the context exits, so the
+    publication overlaps with the next I/O of the handler"""
+
+    def __init__(self, uow: Optional[DynamoDbUnitOfWork] = None) -> None:
+        self._uow = uow or DynamoDbUnitOfWork()
+        self._message_bus_client: Optional[
+            event_publisher.AsyncEventBridgePublisher
+        ] = None
+        self._defer_publish = False
+        self._pending_publishes: List[
+            "asyncio.Task[event_publisher.PublishReport]"
+        ] = []
+
+    async def __aenter__(self) -> "AsyncDynamoDbUnitOfWork":
+        self._defer_publish = True
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self._defer_publish = False
+        await self.flush_events()
+
+    @property
+    def session(self) -> persistence_commons.SessionDB:
+        return self._uow.session
+
+    @property
+    def batch_report(self) -> Optional[persistence_commons.BatchWriteReport]:
+        return self._uow.batch_report
+
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        with self._uow.transaction_context(transaction_type=TransactionType.SINGLE):
+            yield
+            await self.commit()
+
+    @contextlib.asynccontextmanager
+    async def batch(self, max_workers: int = 1) -> AsyncIterator[None]:
+        with self._uow.transaction_context(
+            transaction_type=TransactionType.BATCH, max_workers=max_workers
+        ):
+            yield
+            await self.commit()
+
+    @contextlib.asynccontextmanager
+    async def bulk(
+        self, max_workers: int = DEFAULT_BULK_MAX_WORKERS
+    ) -> AsyncIterator[None]:
+        with self._uow.transaction_context(
+            transaction_type=TransactionType.BULK, max_workers=max_workers
+        ):
+            yield
+            await self.commit()
+
+    async def commit(self) -> None:
+        import asyncio
+
+        await asyncio.to_thread(self._uow.execute_write_operations)
+        events = self._uow.pull_events()
+        if not events:
+            return
+        _LOGGER.info("Publishing event domain associated")
+        if self._message_bus_client is None:
+            self._message_bus_client = event_publisher.AsyncEventBridgePublisher(
+                publisher=self._uow.publisher()
+            )
+        publish_task = asyncio.create_task(
+            self._message_bus_client.publish(events=events)
+        )
+        if self._defer_publish:
+            self._pending_publishes.append(publish_task)
+        else:
+            await publish_task
+
+    async def flush_events(self) -> None:
+        """Wait for the events publications still running"""
+        import asyncio
+
+        pending_publishes, self._pending_publishes = self._pending_publishes, []
+        await asyncio.gather(*pending_publishes)
+
+    async def rollback(self) -> None:
+        import asyncio
+
+        await asyncio.to_thread(self._uow.rollback)
+
+    def publish_events(self, events: List[base_types.DomainEvent]) -> None:
+        self._uow.publish_events(events=events)
+
+
 ############## DYNAMO DB WRITE OPERATION IN DB COMPONENTS ####################################################
 
 
@@ -119,6 +355,13 @@ class DynamoBatchSizePerTrxExceedsError(Exception):
         super().__init__("DynamoDB only allows 100 operations in a single transaction")
 
 
+class DynamoTransactionSizeExceedsError(Exception):
+    def __init__(self, size: int) -> None:
+        super().__init__(
+            f"DynamoDB only allows {MAX_DYNAMO_DB_TRX_SIZE_BYTES} bytes in a single transaction. Transaction size: {size}"
+        )
+
+
 class WrongProcessTransactionTypeSelectedError(Exception):
     ...
 
@@ -127,10 +370,49 @@ class TransactionFailedError(Exception):
     ...
 
 
+class TransactionThrottledError(TransactionFailedError):
+    ...
+
+
+class VersionConflictError(TransactionFailedError):
+    """The condition of a write operation failed: the item was updated by someone
+    else since it was read (or it already exists, for puts)"""
+
+    def __init__(self, ids: List[str]) -> None:
+        super().__init__(f"Version conflict in items {ids}")
+        self.ids = ids
+
+
+class BatchTransactionFailedError(TransactionFailedError):
+    """pending_ids are the ids of the operations not written: the ones of the
+    failed chunks and of the chunks not sent"""
+
+    def __init__(
+        self,
+        report: persistence_commons.BatchWriteReport,
+        pending_ids: Optional[List[str]] = None,
+    ) -> None:
+        super().__init__(
+            f"[{len(report.failed_chunks)}] of [{len(report.chunks)}] transactions failed"
+        )
+        self.report = report
+        self.pending_ids = pending_ids or []
+
+
+_THROTTLING_ERROR_CODES: Final = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "ThrottlingError",
+    "ProvisionedThroughputExceeded",
+}
+
+
 class DefaultDynamoDBSession(persistence_commons.SessionDB):
     def __init__(self) -> None:
         self._batches: Dict[str, persistence_commons.WriteOperation] = {}
-        self.client = boto3.client("dynamodb")
+        self.client = clients.get_dynamodb_client()
+        self.identity_map = identity_map.IdentityMap()
 
     def add_write_operation(self, operation: WriteOperation) -> None:
         if self._batches.get(operation.id):
@@ -140,8 +422,16 @@ class DefaultDynamoDBSession(persistence_commons.SessionDB):
     def clear_batches(self) -> None:
         self._batches.clear()
 
-    @backoff.on_exception(backoff.fibo, TransactionFailedError, max_tries=3, max_time=4)
+    @retry.on_exception(
+        "fibo",
+        TransactionFailedError,
+        max_tries=3,
+        max_time=4,
+        giveup=lambda e: isinstance(e, VersionConflictError),
+    )
     def _presist_operations(self, operations: List[WriteOperation]) -> None:
+        from botocore import exceptions as boto3_exceptions
+
         try:
             items = [op.entity_serialized for op in operations]
             self.client.transact_write_items(TransactItems=items)
@@ -149,12 +439,24 @@ class DefaultDynamoDBSession(persistence_commons.SessionDB):
             error_code = e.response["Error"]["Code"]
             _LOGGER.exception(f"Transaction error {error_code}. Exception {str(e)}")
             if error_code == "TransactionCanceledException":
-                raise TransactionFailedError(
-                    ".".join(
-                        reason["Message"]
-                        for reason in e.response["CancellationReasons"]
-                    )
+                reasons = e.response["CancellationReasons"]
+                conflicts = [
+                    op
+                    for op, reason in zip(operations, reasons)
+                    if reason.get("Code") == "ConditionalCheckFailed"
+                ]
+                if conflicts:
+                    for op in conflicts:
+                        op.conflicted()
+                    raise VersionConflictError(ids=[op.id for op in conflicts]) from e
+                error_type = (
+                    TransactionThrottledError
+                    if any(r.get("Code") in _THROTTLING_ERROR_CODES for r in reasons)
+                    else TransactionFailedError
                 )
+                raise error_type(".".join(reason["Message"] for reason in reasons))
+            if error_code in _THROTTLING_ERROR_CODES:
+                raise TransactionThrottledError(error_code) from e
             raise TransactionFailedError(error_code) from e
         except Exception as e:
             _LOGGER.exception(f"Transaction error. Exception {str(e)}")
@@ -166,18 +468,205 @@ class DefaultDynamoDBSession(persistence_commons.SessionDB):
             return
         if len(self._batches) > MAX_DYNAMO_DB_BATCH_SIZE_PER_TRX:
             raise DynamoBatchSizePerTrxExceedsError()
+        transaction_size = sum(op.size for op in self._batches.values())
+        if transaction_size > MAX_DYNAMO_DB_TRX_SIZE_BYTES:
+            raise DynamoTransactionSizeExceedsError(size=transaction_size)
 
-        self._presist_operations(operations=[*self._batches.values()])
+        operations = [*self._batches.values()]
+        self._presist_operations(operations=operations)
         self.clear_batches()
+        for op in operations:
+            op.committed()
+
+    def execute_in_batch_transaction(
+        self, max_workers: int = 1
+    ) -> persistence_commons.BatchWriteReport:
+        """Commit the operations in chunks of transactions. By default the chunks
+        are committed one after another and the process stops in the first failure.
+        With max_workers > 1 all the chunks are committed concurrently.
+        It raises BatchTransactionFailedError when a chunk fails, and the unit of
+        work contexts roll back everything still pending then. The chunks
+        written are not undone: error.pending_ids (and error.report) tell which
+        operations weren't written, to build them again in a new context"""
+        if not self._batches:
+            _LOGGER.info("[UoW]: No write operations to process")
+            return persistence_commons.BatchWriteReport()
+        chunks = list(
+            split_operations_per_transaction(operations=[*self._batches.values()])
+        )
+        return self._execute_in_chunks(
+            chunks=chunks, persist=self._presist_operations, max_workers=max_workers
+        )
 
-    def execute_in_batch_transaction(self) -> None:
+    def execute_in_bulk(
+        self, max_workers: int = DEFAULT_BULK_MAX_WORKERS
+    ) -> persistence_commons.BatchWriteReport:
+        """Write the put operations through BatchWriteItem requests of 25 items.
+        The unprocessed items are retried with exponential backoff. A failed chunk
+        could be partially written. As in batches, error.pending_ids has the ids
+        of the operations of the failed chunks, which the contexts roll back"""
         if not self._batches:
             _LOGGER.info("[UoW]: No write operations to process")
-            return
-        operations_spplitted: Iterator[List[WriteOperation]] = base_types.split_list(
-            input_list=[*self._batches.values()],
-            chunk_size=MAX_DYNAMO_DB_BATCH_SIZE_PER_TRX,
+            return persistence_commons.BatchWriteReport()
+        operations = [*self._batches.values()]
+        # Checked before sending any chunk, so an operation that isn't a put
+        # doesn't leave the previous chunks written
+        for op in operations:
+            op.bulk_request
+        chunks: List[List[WriteOperation]] = list(
+            base_types.split_list(
+                input_list=operations, chunk_size=MAX_DYNAMO_DB_BATCH_WRITE_SIZE
+            )
         )
-        for operations in operations_spplitted:
-            self._presist_operations(operations=operations)
-        self.clear_batches()
+        return self._execute_in_chunks(
+            chunks=chunks,
+            persist=self._presist_bulk_operations,
+            max_workers=max_workers,
+        )
+
+    def _execute_in_chunks(
+        self,
+        chunks: List[List[WriteOperation]],
+        persist: Callable[[List[WriteOperation]], None],
+        max_workers: int,
+    ) -> persistence_commons.BatchWriteReport:
+        persist_chunk = functools.partial(self._persist_chunk, persist=persist)
+        results: List[persistence_commons.ChunkWriteResult] = []
+        try:
+            if max_workers > 1:
+                from concurrent import futures
+
+                with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    chunk_futures = [
+                        executor.submit(persist_chunk, index, operations)
+                        for index, operations in enumerate(chunks)
+                    ]
+                    # Every chunk is waited for before raising an unexpected
+                    # error, so the ones written are still removed below
+                    futures.wait(chunk_futures)
+                results = [f.result() for f in chunk_futures if not f.exception()]
+                for f in chunk_futures:
+                    error = f.exception()
+                    if error is not None:
+                        raise error
+            else:
+                for index, operations in enumerate(chunks):
+                    results.append(persist_chunk(index, operations))
+                    if not results[-1].succeeded:
+                        break
+        finally:
+            for result in results:
+                if result.succeeded:
+                    for op in chunks[result.index]:
+                        self._batches.pop(op.id, None)
+                        op.committed()
+        report = persistence_commons.BatchWriteReport(chunks=results)
+        if not report.succeeded:
+            raise BatchTransactionFailedError(
+                report=report, pending_ids=[*self._batches]
+            )
+        return report
+
+    def _persist_chunk(
+        self,
+        index: int,
+        operations: List[WriteOperation],
+        persist: Callable[[List[WriteOperation]], None],
+    ) -> persistence_commons.ChunkWriteResult:
+        try:
+            persist(operations)
+            return persistence_commons.ChunkWriteResult(
+                index=index, operations_qty=len(operations), succeeded=True
+            )
+        except TransactionFailedError as e:
+            return persistence_commons.ChunkWriteResult(
+                index=index,
+                operations_qty=len(operations),
+                succeeded=False,
+                throttled=isinstance(e, TransactionThrottledError),
+                error=str(e),
+            )
+
+    def _presist_bulk_operations(self, operations: List[WriteOperation]) -> None:
+        from botocore import exceptions as boto3_exceptions
+
+        request_items: Dict[str, List[Dict[str, Any]]] = {}
+        for op in operations:
+            request_items.setdefault(op.table_name, []).append(op.bulk_request)
+        try:
+            unprocessed = self._batch_write_request(request_items=request_items)
+        except boto3_exceptions.ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            _LOGGER.exception(f"Bulk write error {error_code}. Exception {str(e)}")
+            if error_code in _THROTTLING_ERROR_CODES:
+                raise TransactionThrottledError(error_code) from e
+            raise TransactionFailedError(error_code) from e
+        if unprocessed:
+            items_qty = sum(len(requests) for requests in unprocessed.values())
+            raise TransactionThrottledError(
+                f"[{items_qty}] items unprocessed after all the retries"
+            )
+
+    @retry.on_predicate(
+        "expo",
+        bool,
+        max_tries=BATCH_WRITE_MAX_TRIES,
+        max_time=BATCH_WRITE_MAX_TIME,
+        factor=0.05,
+    )
+    def _batch_write_request(
+        self, request_items: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        # request_items is replaced in place by the unprocessed items, so each
+        # retry only sends again the items DynamoDB didn't write
+        response = self.client.batch_write_item(RequestItems={**request_items})
+        unprocessed: Dict[str, List[Dict[str, Any]]] = response.get(
+            "UnprocessedItems", {}
+        )
+        request_items.clear()
+        request_items.update(unprocessed)
+        return unprocessed
+
+
+def split_operations_per_transaction(
+    operations: List[WriteOperation],
+) -> Iterator[List[WriteOperation]]:
+    """Split the operations in chunks that respect the DynamoDB transaction limits
+    (operations qty and request size)"""
+    chunk: List[WriteOperation] = []
+    chunk_size = 0
+    for op in operations:
+        if op.size > MAX_DYNAMO_DB_TRX_SIZE_BYTES:
+            raise DynamoTransactionSizeExceedsError(size=op.size)
+        if chunk and (
+            len(chunk) == MAX_DYNAMO_DB_BATCH_SIZE_PER_TRX
+            or chunk_size + op.size > MAX_DYNAMO_DB_TRX_SIZE_BYTES
+        ):
+            yield chunk
+            chunk, chunk_size = [], 0
+        chunk.append(op)
+        chunk_size += op.size
+    if chunk:
+        yield chunk
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def retry_on_conflict(max_tries: int = 3, max_time: float = 5) -> Callable[[F], F]:
+    """Retry the decorated function when it raises VersionConflictError. The
+    function must load the items it updates, so every try works with the
+    last version stored:
+
+        @unit_of_work.retry_on_conflict()
+        def block_employee(uow, input):
+            employee = repository.get_by_id(id=input.id)
+            ...
+    """
+    return retry.on_exception(  # type: ignore
+        "expo",
+        VersionConflictError,
+        max_tries=max_tries,
+        max_time=max_time,
+        factor=0.01,
+    )
@@ -1,11 +1,24 @@
+import abc
 import enum
 import decimal
 import pydantic
 import uuid
 import time
+import dataclasses
 import functools
-from typing import Dict, Any, Iterator, List, Callable
-from pydantic_settings import BaseSettings
+from typing import (
+    Dict,
+    Any,
+    Iterator,
+    List,
+    Callable,
+    FrozenSet,
+    Optional,
+    ClassVar,
+    Type,
+    TypeVar,
+)
+from src.shared.settings import Settings, SettingsNotLoadedError, get_settings
 
 
 class NamedEnum(str, enum.Enum):
@@ -81,7 +94,11 @@ class Key(Inmutable):
         return attr_dict
 
     def _key(self, **kwargs: Dict[str, Any]) -> str:
-        attrs_dict = super().model_dump(**kwargs)  # type: ignore
+        # The values of the fields are already the primitives the key is made
+        # of: they are only dumped for the dump options
+        attrs_dict = (
+            super().model_dump(**kwargs) if kwargs else self.__dict__  # type: ignore
+        )
 
         def values(attrs_dict: Dict[str, Any]) -> Iterator[str]:
             for v in attrs_dict.values():
@@ -108,10 +125,20 @@ class Entity(pydantic.BaseModel):
     id: "EntityId"
 
 
+class SecondaryIndex(Inmutable):
+    """Secondary index of the aggregate table. Declared by the aggregate in
+    secondary_indexes to enable the repository queries by partition_key"""
+
+    name: str
+    partition_key: str
+    sort_key: Optional[str] = None
+
+
 class RootEntity(Entity):
     created: EpochTime = pydantic.Field(default_factory=EpochTime.now)
     last_update: EpochTime = pydantic.Field(default_factory=EpochTime.now)
     version: int = pydantic.Field(default=0)
+    secondary_indexes: ClassVar[List[SecondaryIndex]] = []
 
     def _increase_version(self) -> None:
         self.version += 1
@@ -122,7 +149,42 @@ class RootEntity(Entity):
 
 
 class DomainAggregate(RootEntity):
+    """Track the fields assigned since the aggregate was loaded (or saved), so the
+    repository only updates them. In place mutations (e.g. list.append) are not
+    tracked: use mark_dirty for them"""
+
     _events: List["DomainEvent"]
+    _dirty_fields: FrozenSet[str] = pydantic.PrivateAttr(default_factory=frozenset)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            # An immutable frozenset is replaced instead of mutating a set, so a
+            # copy (model_copy copies the private attributes shallowly) never
+            # shares changes with the original. Set through the private
+            # attributes dict: assigning _dirty_fields would go through this
+            # method (and pydantic's) again
+            private = self.__pydantic_private__
+            if private is not None:
+                private["_dirty_fields"] = private["_dirty_fields"] | {name}
+
+    @property
+    def dirty_fields(self) -> FrozenSet[str]:
+        # Read from the private attributes dict: the attribute access goes
+        # through pydantic's __getattr__
+        private = self.__pydantic_private__
+        if private is None:
+            return frozenset()
+        dirty_fields: FrozenSet[str] = private["_dirty_fields"]
+        return dirty_fields
+
+    def mark_dirty(self, *names: str) -> None:
+        private = self.__pydantic_private__
+        if private is not None:
+            private["_dirty_fields"] = private["_dirty_fields"] | set(names)
+
+    def clear_dirty_fields(self) -> None:
+        self._dirty_fields = frozenset()
 
     @property
     def events(self) -> List["DomainEvent"]:
@@ -137,6 +199,26 @@ class DomainAggregate(RootEntity):
         return events
 
 
+ES = TypeVar("ES", bound="EventSourcedAggregate")
+
+
+class EventSourcedAggregate(DomainAggregate):
+    """Aggregate persisted as its events (see EventSourcedRepository). It is
+    rebuilt from its creation event and the rest of its events applied in order.
+    A snapshot of the state is stored every snapshot_every events"""
+
+    snapshot_every: ClassVar[int] = 100
+
+    @classmethod
+    @abc.abstractmethod
+    def from_event(cls: Type[ES], event: "DomainEvent") -> ES:
+        ...
+
+    @abc.abstractmethod
+    def apply(self, event: "DomainEvent") -> None:
+        ...
+
+
 class RepositoryAggregate(RootEntity):
     ...
 
@@ -149,12 +231,49 @@ class Command(Inmutable):
     ...
 
 
-class DomainEvent(Inmutable):
-    id: str = pydantic.Field(default_factory=UUIDGenerator.uuid)
-    created: EpochTime = pydantic.Field(default_factory=EpochTime.now)
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class DomainEvent:
+    """Events are slots dataclasses instead of models: the domain creates them
+    without validation. They are validated by pydantic where they cross a
+    boundary (the event consumer, the outbox and the event store) through
+    validate_event, and encoded to JSON by encode_event. Subclasses must be
+    declared with the same dataclass options"""
+
+    __pydantic_config__: ClassVar[pydantic.ConfigDict] = pydantic.ConfigDict(
+        extra="ignore", revalidate_instances="always"
+    )
+
+    id: str = dataclasses.field(default_factory=UUIDGenerator.uuid)
+    created: EpochTime = dataclasses.field(default_factory=EpochTime.now)
     domain_name: str
 
 
+DE = TypeVar("DE", bound=DomainEvent)
+
+
+_EVENT_ADAPTERS: Dict[type, "pydantic.TypeAdapter[Any]"] = {}
+
+
+def _event_adapter(event_type: Type[DE]) -> "pydantic.TypeAdapter[DE]":
+    adapter = _EVENT_ADAPTERS.get(event_type)
+    if adapter is None:
+        adapter = _EVENT_ADAPTERS[event_type] = pydantic.TypeAdapter(event_type)
+    return adapter
+
+
+def validate_event(event_type: Type[DE], data: Any) -> DE:
+    """Validate the data (a dict, or an event to check) into an event of the type.
+    Raises pydantic.ValidationError"""
+    return _event_adapter(event_type).validate_python(data)
+
+
+def encode_event(event: DE) -> str:
+    """JSON of the event, encoded by pydantic-core from its attributes"""
+    # The serializer directly: TypeAdapter.dump_json adds its options handling
+    # to every call
+    return _event_adapter(type(event)).serializer.to_json(event).decode()
+
+
 def split_list(input_list: List[Any], chunk_size: int) -> Iterator[Any]:
     """Split list in N chunk size. Finally return iterator with the result"""
     if chunk_size <= 0:
@@ -168,7 +287,3 @@ class Country(NamedEnum):
     ARG = enum.auto()
     DOM = enum.auto()
     CO = enum.auto()
-
-
-class Settings(BaseSettings):
-    ...
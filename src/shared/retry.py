@@ -0,0 +1,48 @@
+import functools
+from typing import Any, Callable, Optional, Type, Tuple, Union
+
+#########################################################################################
+#           RETRY DECORATORS                                                            #
+#########################################################################################
+# Same decorators as the backoff library, but backoff is imported (and the
+# decorator built) on the first call instead of when the module is imported.
+# The wait generator is given by its name in backoff (e.g. "fibo", "expo").
+
+Func = Callable[..., Any]
+
+
+def on_exception(
+    wait_gen: str,
+    exception: Union[Type[Exception], Tuple[Type[Exception], ...]],
+    **kwargs: Any,
+) -> Callable[[Func], Func]:
+    return _lazy_backoff("on_exception", wait_gen, exception, **kwargs)
+
+
+def on_predicate(
+    wait_gen: str, predicate: Callable[[Any], bool], **kwargs: Any
+) -> Callable[[Func], Func]:
+    return _lazy_backoff("on_predicate", wait_gen, predicate, **kwargs)
+
+
+def _lazy_backoff(
+    decorator_name: str, wait_gen: str, *args: Any, **kwargs: Any
+) -> Callable[[Func], Func]:
+    def decorator(func: Func) -> Func:
+        decorated: Optional[Func] = None
+
+        @functools.wraps(func)
+        def wrapper(*func_args: Any, **func_kwargs: Any) -> Any:
+            nonlocal decorated
+            if decorated is None:
+                import backoff
+
+                backoff_decorator = getattr(backoff, decorator_name)
+                decorated = backoff_decorator(
+                    getattr(backoff, wait_gen), *args, **kwargs
+                )(func)
+            return decorated(*func_args, **func_kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,64 @@
+import functools
+import pydantic
+from typing import Any, Set, Type, TypeVar, cast
+
+
+class SettingsNotLoadedError(Exception):
+    def __init__(self, settings_type: Type["Settings"]) -> None:
+        super().__init__(
+            f"{settings_type.__name__} must be created with {settings_type.__name__}.load() "
+            "or get_settings() to read the environment"
+        )
+
+
+class Settings(pydantic.BaseModel):
+    """Declaration of settings loaded by pydantic_settings.BaseSettings (env vars,
+    dotenv, secrets and the model_config settings options). Instances are
+    created with load (or get_settings), which validates them through a
+    BaseSettings subclass of the type. pydantic_settings is imported then
+    instead of when the module is imported. Creating them directly raises
+    SettingsNotLoadedError instead of skipping the environment"""
+
+    model_config = pydantic.ConfigDict(extra="ignore")
+
+    def __init__(self, **values: Any) -> None:
+        if type(self) not in _BASE_SETTINGS_TYPES:
+            raise SettingsNotLoadedError(settings_type=type(self))
+        super().__init__(**values)
+
+    @classmethod
+    def load(cls: Type["S"], **values: Any) -> "S":
+        """values take precedence over the other sources, as in BaseSettings"""
+        return cast(S, _base_settings_type(cls)(**values))
+
+
+S = TypeVar("S", bound=Settings)
+_BASE_SETTINGS_TYPES: Set[Type[Settings]] = set()
+
+
+@functools.lru_cache(maxsize=None)
+def _base_settings_type(settings_type: Type[Settings]) -> Type[Settings]:
+    from pydantic_settings import BaseSettings
+
+    # BaseSettings comes after the type in the MRO, but pydantic takes its
+    # model_config first: the options of the type are merged over it instead
+    base_settings_type = type(
+        settings_type.__name__,
+        (settings_type, BaseSettings),
+        {
+            "__module__": settings_type.__module__,
+            "model_config": {**BaseSettings.model_config, **settings_type.model_config},
+        },
+    )
+    _BASE_SETTINGS_TYPES.add(base_settings_type)
+    return base_settings_type
+
+
+def get_settings(settings_type: Type[S]) -> S:
+    """Return the settings instance of the type. It is parsed once per process"""
+    return cast(S, _settings_instance(settings_type))
+
+
+@functools.lru_cache(maxsize=None)
+def _settings_instance(settings_type: Type[Settings]) -> Settings:
+    return settings_type.load()
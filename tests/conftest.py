@@ -15,6 +15,7 @@ def pytest_generate_tests(metafunc):
     os.environ["BACKOFF_DEFAULT_MAX_TIME"] = "0"
     os.environ["AGGREGATE_COMPANY_TABLE_NAME"] = "company-aggregate-table"
     os.environ["AGGREGATE_COMPANY_TABLE_KEY_NAME"] = "id"
+    os.environ["COMPANY_READ_MODELS_TABLE_NAME"] = "company-read-models-table"
 
 
 @pytest.fixture
@@ -15,3 +15,15 @@ def test_should_create_new_company() -> None:
     assert issubclass(aggregate.Company, base_types.DomainAggregate)
     assert isinstance(company.events[0], events.CompanyCreated)
     assert company.is_enabled()
+
+
+@pytest.mark.unittest
+def test_should_track_fields_changed_when_company_is_disabled() -> None:
+    company = aggregate.Company.create(
+        name="TEST", address="test address", country=base_types.Country.USA
+    )
+    assert company.dirty_fields == frozenset()
+    company.disable()
+    assert company.dirty_fields == {"status", "last_update"}
+    company.clear_dirty_fields()
+    assert company.dirty_fields == frozenset()
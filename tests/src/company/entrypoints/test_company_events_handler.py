@@ -0,0 +1,24 @@
+import json
+import pytest
+from src.shared import base_types
+from src.company.domain import events
+from src.company.entrypoints.events import company
+from tests.src.fake_shared_adapters import FakeEventBridgePublisher
+
+
+@pytest.mark.unittest
+def test_should_handle_company_created_event(caplog: pytest.LogCaptureFixture) -> None:
+    event = events.CompanyCreated(
+        company_id="company",
+        name="Company test",
+        address="Street 123",
+        country=base_types.Country.ARG,
+    )
+    entry = FakeEventBridgePublisher().convert_to_event_bridge_event(event)
+    with caplog.at_level("INFO"):
+        response = company.handler(
+            {"detail-type": entry["DetailType"], "detail": json.loads(entry["Detail"])},
+            None,
+        )
+    assert response is None
+    assert "Company company created: Company test (ARG)" in caplog.text
@@ -0,0 +1,71 @@
+import os
+import sys
+import pytest
+import pathlib
+import subprocess
+from typing import Dict, List, Tuple
+
+HANDLER_MODULE = "src.company.entrypoints.cron.handler_test"
+# The handler is measured against the import of pydantic, which it always needs:
+# only the time of the modules that pydantic doesn't import is the handler's own
+BASELINE_MODULE = "pydantic"
+LAZY_MODULES = ("boto3", "botocore", "backoff", "pydantic_settings", "asyncio")
+# Measured here: the handler's own import time is ~1.0-1.2 times the import time
+# of pydantic, and ~1.9 times with boto3 imported eagerly
+MAX_OWN_IMPORT_TIME_RATIO = 1.5
+RUNS = 3
+ROOT_PATH = pathlib.Path(__file__).parents[4]
+
+
+def _import_profile(module: str) -> Dict[str, Tuple[int, int]]:
+    """Import the module in a new interpreter with `python -X importtime` and
+    return the self and cumulative import time (us) of each module imported"""
+    env = {k: v for k, v in os.environ.items() if k != "PREWARM_AWS_CLIENTS"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_PATH,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules_imported: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+        modules_imported[name.strip()] = (int(self_time), int(cumulative))
+    return modules_imported
+
+
+def _import_profiles(module: str) -> List[Dict[str, Tuple[int, int]]]:
+    return [_import_profile(module) for _ in range(RUNS)]
+
+
+@pytest.mark.unittest
+def test_should_handler_import_not_load_heavy_sdk_modules() -> None:
+    modules_imported = _import_profile(HANDLER_MODULE)
+    # Modules already imported by pydantic (e.g. asyncio with some versions of
+    # its dependencies) are not under the control of the shared package
+    baseline_modules_imported = _import_profile(BASELINE_MODULE)
+    assert [
+        m
+        for m in LAZY_MODULES
+        if m in modules_imported and m not in baseline_modules_imported
+    ] == []
+
+
+@pytest.mark.unittest
+def test_should_handler_own_import_time_stay_within_budget() -> None:
+    # Best of some runs, to leave out most of the noise of the machine
+    baseline_profiles = _import_profiles(BASELINE_MODULE)
+    baseline_time = min(p[BASELINE_MODULE][1] for p in baseline_profiles)
+    own_time = min(
+        sum(
+            self_time
+            for name, (self_time, _) in profile.items()
+            if name not in baseline_profiles[0]
+        )
+        for profile in _import_profiles(HANDLER_MODULE)
+    )
+    assert own_time <= baseline_time * MAX_OWN_IMPORT_TIME_RATIO
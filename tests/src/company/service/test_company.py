@@ -1,5 +1,8 @@
+import pytest
 from src.company.service import commands, company as service
+from src.company.domain import aggregate, events
 from src.shared.adapters import unit_of_work
+from tests.src.fake_shared_adapters import FakeDynamoDbUnitOfWork
 
 
 # def test_create_company(uow: unit_of_work.FakeUnitOfWork) -> None:
@@ -10,3 +13,14 @@ from src.shared.adapters import unit_of_work
 #     )
 #     service.create_new_company(uow=uow, input=request)
 #     assert True
+
+
+@pytest.mark.unittest
+def test_should_create_company_and_publish_events(
+    uow: FakeDynamoDbUnitOfWork,
+) -> None:
+    request = commands.CreateCompany(name="test", address="test_address", country="USA")
+    service.create_new_company(uow=uow, input=request)
+    company = service.get_company_by_id(uow=uow, input="test")
+    assert company.status == aggregate.CompanyStatus.ENABLED
+    assert uow._message_bus_client.is_event_type_was_published(events.CompanyCreated)
@@ -0,0 +1,123 @@
+import pytest
+from typing import Any, Dict, List, Optional
+from src.company.domain import aggregate
+from src.company.service import projections, company as company_service
+from src.shared import base_types
+from src.shared.adapters import projection_engine, unit_of_work
+
+
+def stream_record(
+    seq: int,
+    event_name: str,
+    old: Optional[Dict[str, Any]] = None,
+    new: Optional[Dict[str, Any]] = None,
+    key: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    image = new or old or {}
+    key = key or image.get("id._key") or {"S": str(seq)}
+    stream_record = {"SequenceNumber": str(seq), "Keys": {"id._key": key}}
+    if old:
+        stream_record["OldImage"] = old
+    if new:
+        stream_record["NewImage"] = new
+    return {"eventName": event_name, "dynamodb": stream_record}
+
+
+@pytest.mark.unittest
+def test_should_project_companies_by_country(
+    uow: unit_of_work.DynamoDbUnitOfWork,
+) -> None:
+    repository = company_service.company_repository_instance(uow=uow)
+    companies = [
+        aggregate.Company.create(name=name, address="a", country=base_types.Country.USA)
+        for name in ("a", "b")
+    ]
+    images = [repository._serialize_entity(company) for company in companies]
+    companies[1].disable()
+    disabled_image = repository._serialize_entity(companies[1])
+
+    engine = projection_engine.ProjectionEngine(
+        uow=uow,
+        checkpoints_table_name=projections.read_models_table_name(),
+        records_per_commit=2,
+    )
+    engine.register(projections.companies_by_country_projector(uow=uow))
+    response = engine.handle(
+        {
+            "Records": [
+                stream_record(1, "INSERT", new=images[0]),
+                stream_record(2, "INSERT", new=images[1]),
+                stream_record(3, "MODIFY", old=images[1], new=disabled_image),
+            ]
+        }
+    )
+
+    assert response == {"batchItemFailures": []}
+    read_model = projections.get_companies_by_country(
+        uow=uow, country=base_types.Country.USA
+    )
+    assert (read_model.companies, read_model.enabled_companies) == (2, 1)
+    assert read_model.version == 2
+
+
+@pytest.mark.unittest
+def test_should_skip_changes_already_projected_when_redelivered(
+    uow: unit_of_work.DynamoDbUnitOfWork,
+) -> None:
+    repository = company_service.company_repository_instance(uow=uow)
+    companies = [
+        aggregate.Company.create(name=name, address="a", country=base_types.Country.USA)
+        for name in ("a", "b", "c")
+    ]
+    records = [
+        stream_record(i, "INSERT", new=repository._serialize_entity(company))
+        for i, company in enumerate(companies, start=1)
+    ]
+    engine = projection_engine.ProjectionEngine(
+        uow=uow,
+        checkpoints_table_name=projections.read_models_table_name(),
+        records_per_commit=2,
+    )
+    engine.register(projections.companies_by_country_projector(uow=uow))
+
+    # The first chunk is committed and the invocation times out: Lambda
+    # delivers the whole batch again
+    engine._project_chunk(
+        changes=[
+            projection_engine.Change.from_stream_record(record)
+            for record in records[:2]
+        ]
+    )
+    assert engine.handle({"Records": records}) == {"batchItemFailures": []}
+    assert engine.handle({"Records": records}) == {"batchItemFailures": []}
+
+    read_model = projections.get_companies_by_country(
+        uow=uow, country=base_types.Country.USA
+    )
+    assert (read_model.companies, read_model.enabled_companies) == (3, 3)
+
+
+@pytest.mark.unittest
+def test_should_report_first_record_of_failed_chunk(
+    uow: unit_of_work.DynamoDbUnitOfWork,
+) -> None:
+    projected: List[str] = []
+
+    def projector(
+        change: projection_engine.Change, read_models: projection_engine.ReadModels
+    ) -> None:
+        if change.sequence_number == "3":
+            raise ValueError("projector error")
+        projected.append(change.sequence_number)
+
+    engine = projection_engine.ProjectionEngine(
+        uow=uow,
+        checkpoints_table_name=projections.read_models_table_name(),
+        records_per_commit=2,
+    )
+    engine.register(projector)
+    response = engine.handle(
+        {"Records": [stream_record(i, "INSERT", new={}) for i in range(1, 6)]}
+    )
+    assert response == {"batchItemFailures": [{"itemIdentifier": "3"}]}
+    assert projected == ["1", "2"]
@@ -0,0 +1,82 @@
+"""Benchmark of the bulk status transitions of Employee and their update, against
+the same work done one employee at a time. It is not a test (the times are too
+noisy for an assertion). Run it from the repository root:
+
+    python -m tests.src.employee.domain.benchmark_bulk_transitions
+
+Measured here with 1000 employees (best of 7), per employee:
+
+    one at a time (block + update)                    ~42-53us
+    bulk (block_many + update_many)                   ~22-30us
+    bulk, when block_many and update_many looped
+    over block and update                             ~41-44us
+"""
+import gc
+import os
+import time
+from typing import Callable, List
+from src.employee.domain import aggregate
+from src.shared.adapters import unit_of_work
+from src.shared.adapters.persistence.dynamodb_repository import DynamoDbRepository
+
+EMPLOYEES = 1000
+RUNS = 7
+
+
+def _employees() -> List[aggregate.Employee]:
+    employees = [
+        aggregate.Employee(
+            id=aggregate.EmployeeId(name=f"name {i}", email=f"employee{i}@test.com"),
+            company_id="company",
+            status=aggregate.EmployeeStatus.ACTIVE,
+        )
+        for i in range(EMPLOYEES)
+    ]
+    for employee in employees:
+        employee.clear_dirty_fields()
+    return employees
+
+
+def _best_times(
+    uow: unit_of_work.UnitOfWork,
+    *block_and_update: Callable[[List[aggregate.Employee]], None],
+) -> List[float]:
+    """Best time of each function. They run by turns, so the noise of the
+    machine is shared between them"""
+    times: List[List[float]] = [[] for _ in block_and_update]
+    for _ in range(RUNS):
+        for function, function_times in zip(block_and_update, times):
+            employees = _employees()
+            gc.collect()
+            start = time.perf_counter()
+            function(employees)
+            function_times.append(time.perf_counter() - start)
+            uow.rollback()
+    return [min(function_times) for function_times in times]
+
+
+def main() -> None:
+    # The session creates a DynamoDB client, which is never called
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-2")
+    uow = unit_of_work.DynamoDbUnitOfWork()
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="employees", entity_type=aggregate.Employee
+    )
+
+    def one_per_employee(employees: List[aggregate.Employee]) -> None:
+        for employee in employees:
+            employee.block()
+            repository.update(employee)
+
+    def bulk(employees: List[aggregate.Employee]) -> None:
+        aggregate.Employee.block_many(employees)
+        repository.update_many(employees)
+
+    one_per_employee_time, bulk_time = _best_times(uow, one_per_employee, bulk)
+    print(f"one at a time: {one_per_employee_time / EMPLOYEES * 1e6:.1f}us/employee")
+    print(f"bulk:          {bulk_time / EMPLOYEES * 1e6:.1f}us/employee")
+    print(f"ratio:         {bulk_time / one_per_employee_time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
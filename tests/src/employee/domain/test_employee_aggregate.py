@@ -18,3 +18,49 @@ def test_should_create_Employee_successfuly() -> None:
     assert len(employee.events) == 1
     event = employee.events[0]
     assert isinstance(event, events.EmployeeCreated)
+
+
+@pytest.mark.unittest
+def test_should_Employee_status_event_share_the_update_timestamp() -> None:
+    employee = aggregate.Employee.create(
+        name="Employee test",
+        email="employee_test@gmail.com",
+        company_id="test_company",
+    )
+    assert employee.events[0].created == employee.created
+    employee.block()
+    event = employee.events[-1]
+    assert isinstance(event, events.EmployeeBlocked)
+    assert event.created == event.last_update == employee.last_update
+    assert employee.is_blocked()
+
+    rebuilt = aggregate.Employee.from_event(employee.events[0])
+    rebuilt.apply(event)
+    assert rebuilt.model_dump() == employee.model_dump()
+
+
+@pytest.mark.unittest
+def test_should_Employee_block_many_share_one_timestamp() -> None:
+    employees = [
+        aggregate.Employee.create(
+            name=f"Employee {i}",
+            email=f"employee_{i}@gmail.com",
+            company_id="test_company",
+        )
+        for i in range(3)
+    ]
+    for employee in employees:
+        employee.pull_events()
+        employee.clear_dirty_fields()
+
+    aggregate.Employee.block_many(employees)
+
+    timestamps = {employee.last_update for employee in employees}
+    assert len(timestamps) == 1
+    for employee in employees:
+        assert employee.is_blocked()
+        assert employee.dirty_fields == {"status", "last_update"}
+        (event,) = employee.pull_events()
+        assert isinstance(event, events.EmployeeBlocked)
+        assert event.employee_id == employee.id.email
+        assert event.last_update in timestamps
@@ -1,6 +1,22 @@
-from typing import List, Dict, Any, Type, Tuple
+import dataclasses
+from typing import List, Dict, Any, Type, Tuple, Optional
+from src.shared import base_types
 from src.shared.adapters import unit_of_work, event_publisher
 from src.shared.adapters.persistence import commons as persistence_commons
+from src.shared.adapters.persistence import identity_map
+
+
+class MockEntityId(base_types.EntityId):
+    value: str
+
+
+class MockEntity(base_types.RootEntity):
+    id: MockEntityId
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class EventFakeCreated(base_types.DomainEvent):
+    domain_name: str = "EventFake"
 
 
 class FakeEventBridgePublisher(
@@ -10,12 +26,15 @@ class FakeEventBridgePublisher(
         super().__init__()
         self.events_published: List[Dict[str, Any]] = []
 
-    def publish(self, events: List[event_publisher.E]) -> None:
-        super().publish(events=events)
+    def publish(self, events: List[event_publisher.E]) -> event_publisher.PublishReport:
+        return super().publish(events=events)
 
     def _put_events(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
         self.events_published.extend(events)
-        return {"FailedEntryCount": 0, "Entries": []}
+        return {
+            "FailedEntryCount": 0,
+            "Entries": [{"EventId": str(len(self.events_published))} for _ in events],
+        }
 
     def is_event_type_was_published(self, event_type: Type[event_publisher.E]) -> bool:
         for e in self.events_published:
@@ -28,19 +47,167 @@ class FakeDynamoDBClient:
     def __init__(self):
         self._data = {}
 
-    def get_item(self, TableName: str, Key: Dict[str, Any]) -> Dict[str, Any]:
+    def get_item(
+        self,
+        TableName: str,
+        Key: Dict[str, Any],
+        ProjectionExpression: Optional[str] = None,
+        ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
         table = self._data.get(TableName, {})
         key = self._deserializer_item(dynamodb_record=Key)
         item = table.get(key["id._key"], None)
+        if item and ProjectionExpression:
+            item = self._project(item, ProjectionExpression, ExpressionAttributeNames)
         return {"Item": item} if item else {}
 
-    def transact_write_items(self, TransactItems: Dict[str, Any]) -> None:
+    def _project(
+        self,
+        item: Dict[str, Any],
+        projection_expression: str,
+        attribute_names: Optional[Dict[str, str]],
+    ) -> Dict[str, Any]:
+        names = [
+            (attribute_names or {}).get(name, name)
+            for name in projection_expression.split(", ")
+        ]
+        return {name: item[name] for name in names if name in item}
+
+    def batch_get_item(self, RequestItems: Dict[str, Any]) -> Dict[str, Any]:
+        responses: Dict[str, List[Dict[str, Any]]] = {}
+        for table_name, request in RequestItems.items():
+            for key in request["Keys"]:
+                item = self.get_item(TableName=table_name, Key=key).get("Item")
+                if item:
+                    responses.setdefault(table_name, []).append(item)
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+    def scan(
+        self,
+        TableName: str,
+        Limit: int,
+        ExclusiveStartKey: Optional[Dict[str, Any]] = None,
+        Segment: int = 0,
+        TotalSegments: int = 1,
+        ProjectionExpression: Optional[str] = None,
+        ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        table = self._data.get(TableName, {})
+        keys = [
+            key for i, key in enumerate(sorted(table)) if i % TotalSegments == Segment
+        ]
+        if ExclusiveStartKey:
+            start_key = self._deserializer_item(dynamodb_record=ExclusiveStartKey)
+            keys = [key for key in keys if key > start_key["id._key"]]
+        page_keys = keys[:Limit]
+        items = [table[key] for key in page_keys]
+        if ProjectionExpression:
+            items = [
+                self._project(item, ProjectionExpression, ExpressionAttributeNames)
+                for item in items
+            ]
+        response: Dict[str, Any] = {"Items": items}
+        if len(keys) > Limit:
+            response["LastEvaluatedKey"] = {"id._key": {"S": page_keys[-1]}}
+        return response
+
+    def query(
+        self,
+        TableName: str,
+        IndexName: str,
+        KeyConditionExpression: str,
+        ExpressionAttributeNames: Dict[str, str],
+        ExpressionAttributeValues: Dict[str, Any],
+        Limit: int,
+        ScanIndexForward: bool = True,
+        ExclusiveStartKey: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        # Only "#pk = :pk [AND <sort key condition>]" key conditions are supported
+        # and every attribute is projected in the indexes
+        values = self._deserializer_item(dynamodb_record=ExpressionAttributeValues)
+        pk_name = ExpressionAttributeNames["#pk"]
+        sk_name = ExpressionAttributeNames.get("#sk", "")
+        sk_condition = KeyConditionExpression.partition(" AND ")[2]
+        records = [
+            (self._deserializer_item(dynamodb_record=item), item)
+            for item in self._data.get(TableName, {}).values()
+        ]
+        matches = [
+            (record, item)
+            for record, item in records
+            if record.get(pk_name) == values[":pk"]
+            and self._match_sort_key(record.get(sk_name), sk_condition, values)
+        ]
+        matches.sort(
+            key=lambda match: (match[0].get(sk_name, ""), match[0]["id._key"]),
+            reverse=not ScanIndexForward,
+        )
+        keys = [record["id._key"] for record, _ in matches]
+        start = 0
+        if ExclusiveStartKey:
+            start_key = self._deserializer_item(dynamodb_record=ExclusiveStartKey)
+            start = keys.index(start_key["id._key"]) + 1
+        page = matches[start : start + Limit]
+        response: Dict[str, Any] = {"Items": [item for _, item in page]}
+        if start + Limit < len(matches):
+            response["LastEvaluatedKey"] = {"id._key": {"S": keys[start + Limit - 1]}}
+        return response
+
+    def _match_sort_key(
+        self, sort_value: Any, condition: str, values: Dict[str, Any]
+    ) -> bool:
+        if not condition:
+            return True
+        if condition.startswith("begins_with"):
+            return str(sort_value).startswith(values[":sk0"])
+        if "BETWEEN" in condition:
+            return bool(values[":sk0"] <= sort_value <= values[":sk1"])
+        operator = condition.split(" ")[1]
+        matches: Dict[str, bool] = {
+            "=": sort_value == values[":sk0"],
+            "<": sort_value < values[":sk0"],
+            "<=": sort_value <= values[":sk0"],
+            ">": sort_value > values[":sk0"],
+            ">=": sort_value >= values[":sk0"],
+        }
+        return matches[operator]
+
+    def transact_write_items(self, TransactItems: List[Dict[str, Any]]) -> None:
+        reasons: List[Any] = [
+            {
+                "Code": "ConditionalCheckFailed",
+                "Message": "The conditional check failed",
+            }
+            if not self._check_condition(
+                transact_item.get("Update") or transact_item["Put"]
+            )
+            else {"Code": "None"}
+            for transact_item in TransactItems
+        ]
+        if any(reason["Code"] != "None" for reason in reasons):
+            from botocore import exceptions as boto3_exceptions
+
+            raise boto3_exceptions.ClientError(
+                {
+                    "Error": {"Code": "TransactionCanceledException"},
+                    "CancellationReasons": reasons,
+                },
+                "TransactWriteItems",
+            )
         for transact_item in TransactItems:
             if "Update" in transact_item:
                 self._update_item(transact_item["Update"])
             elif "Put" in transact_item:
                 self._put_item(transact_item["Put"])
 
+    def batch_write_item(self, RequestItems: Dict[str, Any]) -> Dict[str, Any]:
+        for table_name, requests in RequestItems.items():
+            for request in requests:
+                self._put_item(
+                    {"TableName": table_name, "Item": request["PutRequest"]["Item"]}
+                )
+        return {"UnprocessedItems": {}}
+
     def _deserializer_item(cls, dynamodb_record: Dict[str, Any]) -> Dict[str, Any]:
         from boto3.dynamodb.types import TypeDeserializer
 
@@ -50,25 +217,42 @@ class FakeDynamoDBClient:
         }
         return parsed_record
 
-    def _update_item(self, update_params: Dict[str, any]):
+    def _check_condition(self, update_params: Dict[str, Any]) -> bool:
+        # Only "#name = :value" and "attribute_not_exists(#name)" condition
+        # expressions are supported
+        condition = update_params.get("ConditionExpression")
+        if not condition:
+            return True
+        key_record = update_params.get("Key") or update_params["Item"]
+        key = self._deserializer_item(dynamodb_record=key_record)["id._key"]
+        item = self._data.get(update_params["TableName"], {}).get(key, {})
+        if condition.startswith("attribute_not_exists("):
+            name = condition.removeprefix("attribute_not_exists(").removesuffix(")")
+            return update_params["ExpressionAttributeNames"][name] not in item
+        name, value = condition.split(" = ")
+        attribute_name = update_params["ExpressionAttributeNames"][name]
+        return bool(
+            item.get(attribute_name)
+            == update_params["ExpressionAttributeValues"][value]
+        )
+
+    def _update_item(self, update_params: Dict[str, Any]) -> None:
         table_name = update_params["TableName"]
-        key = self._serialize_key(update_params["Key"])
-        update_expression = update_params["UpdateExpression"]
-        expression_attribute_values = update_params.get("ExpressionAttributeValues", {})
+        key = self._deserializer_item(dynamodb_record=update_params["Key"])["id._key"]
+        attribute_names = update_params.get("ExpressionAttributeNames", {})
+        attribute_values = update_params.get("ExpressionAttributeValues", {})
 
         table = self._data.setdefault(table_name, {})
-        if key not in table:
-            raise ValueError("Item does not exist for Update operation")
+        # As DynamoDB, the update creates the item if it doesn't exist
+        item = dict(table.get(key, update_params["Key"]))
+        # Only "SET #name = :value, ..." update expressions are supported
+        assignments = update_params["UpdateExpression"].removeprefix("SET ")
+        for assignment in assignments.split(", "):
+            name, value = assignment.split(" = ")
+            item[attribute_names.get(name, name)] = attribute_values[value]
+        table[key] = item
 
-        item = table[key]
-
-        # Evaluate update expression and update item
-        for key, value in expression_attribute_values.items():
-            update_expression = update_expression.replace(f":{key}", str(value))
-
-        exec(update_expression, {"item": item})
-
-    def _put_item(self, put_params):
+    def _put_item(self, put_params: Dict[str, Any]) -> None:
         table_name = put_params["TableName"]
         item = put_params["Item"]
         record = self._deserializer_item(dynamodb_record=item)
@@ -83,10 +267,11 @@ class FakeDynamoDBSession(
     def __init__(self) -> None:
         self._batches: Dict[str, persistence_commons.WriteOperation] = {}
         self.client = FakeDynamoDBClient()
+        self.identity_map = identity_map.IdentityMap()
 
 
 class FakeDynamoDbUnitOfWork(unit_of_work.DynamoDbUnitOfWork):
-    def __init__(self) -> None:
-        super().__init__()
-        self._message_bus_client = event_publisher.EventBridgePublisher()
+    def __init__(self, outbox_table_name: Optional[str] = None) -> None:
+        super().__init__(outbox_table_name=outbox_table_name)
+        self._message_bus_client: FakeEventBridgePublisher = FakeEventBridgePublisher()
         self._session = FakeDynamoDBSession()
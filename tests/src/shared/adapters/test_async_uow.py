@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from src.shared.adapters import unit_of_work
+from src.shared.adapters.persistence.dynamodb_repository import (
+    AsyncDynamoDbRepository,
+    DynamoDbRepository,
+)
+from tests.src.fake_shared_adapters import (
+    EventFakeCreated,
+    FakeDynamoDbUnitOfWork,
+    MockEntity,
+    MockEntityId,
+)
+
+
+@pytest.fixture
+def fake_uow() -> FakeDynamoDbUnitOfWork:
+    return FakeDynamoDbUnitOfWork()
+
+
+@pytest.fixture
+def async_uow(fake_uow: FakeDynamoDbUnitOfWork) -> unit_of_work.AsyncDynamoDbUnitOfWork:
+    return unit_of_work.AsyncDynamoDbUnitOfWork(uow=fake_uow)
+
+
+@pytest.fixture
+def async_repository(
+    async_uow: unit_of_work.AsyncDynamoDbUnitOfWork,
+) -> AsyncDynamoDbRepository:
+    return AsyncDynamoDbRepository(
+        repository=DynamoDbRepository(
+            session=async_uow.session, table_name="test_table", entity_type=MockEntity
+        )
+    )
+
+
+@pytest.mark.unittest
+def test_should_async_uow_commit_and_publish_events(
+    fake_uow: FakeDynamoDbUnitOfWork,
+    async_uow: unit_of_work.AsyncDynamoDbUnitOfWork,
+    async_repository: AsyncDynamoDbRepository,
+) -> None:
+    item = MockEntity(id=MockEntityId(value="1"))
+
+    async def run() -> None:
+        async with async_uow.transaction():
+            async_repository.put(item)
+            async_uow.publish_events(events=[EventFakeCreated()])
+        assert await async_repository.find_by_id(id=item.id)
+
+    asyncio.run(run())
+    assert fake_uow._message_bus_client.is_event_type_was_published(EventFakeCreated)
+
+
+@pytest.mark.unittest
+def test_should_async_uow_wait_deferred_publications_on_exit(
+    fake_uow: FakeDynamoDbUnitOfWork,
+    async_uow: unit_of_work.AsyncDynamoDbUnitOfWork,
+    async_repository: AsyncDynamoDbRepository,
+) -> None:
+    async def run() -> None:
+        async with async_uow:
+            async with async_uow.transaction():
+                async_repository.put(MockEntity(id=MockEntityId(value="1")))
+                async_uow.publish_events(events=[EventFakeCreated()])
+            assert len(async_uow._pending_publishes) == 1
+        assert not async_uow._pending_publishes
+
+    asyncio.run(run())
+    assert len(fake_uow._message_bus_client.events_published) == 1
+
+
+@pytest.mark.unittest
+def test_should_async_repository_get_many_in_input_order(
+    async_uow: unit_of_work.AsyncDynamoDbUnitOfWork,
+    async_repository: AsyncDynamoDbRepository,
+) -> None:
+    ids = [MockEntityId(value=str(i)) for i in range(150)]
+
+    async def run() -> None:
+        async with async_uow.batch():
+            for id in ids:
+                async_repository.put(MockEntity(id=id))
+        result = await async_repository.get_many(ids=ids[::-1])
+        assert [item.id for item in result] == ids[::-1]
+
+    asyncio.run(run())
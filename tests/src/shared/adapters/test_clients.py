@@ -0,0 +1,33 @@
+import pytest
+from src.shared.adapters import clients
+
+
+@pytest.fixture(autouse=True)
+def clear_clients():
+    clients.clear()
+    yield
+    clients.clear()
+
+
+@pytest.mark.unittest
+def test_should_get_client_reuse_the_same_instance() -> None:
+    assert clients.get_dynamodb_client() is clients.get_dynamodb_client()
+    assert clients.get_events_client() is not clients.get_dynamodb_client()
+
+
+@pytest.mark.unittest
+def test_should_prewarm_clients_from_environment(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv(clients.PREWARM_ENV_VAR, "dynamodb, events")
+    clients.prewarm_from_environment()
+    assert set(clients._clients) == {"dynamodb", "events"}
+
+
+@pytest.mark.unittest
+def test_should_not_prewarm_clients_without_environment(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv(clients.PREWARM_ENV_VAR, raising=False)
+    clients.prewarm_from_environment()
+    assert not clients._clients
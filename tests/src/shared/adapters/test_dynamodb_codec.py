@@ -0,0 +1,88 @@
+import pytest
+import decimal
+from typing import List, Optional, Dict
+from boto3.dynamodb.types import TypeSerializer
+from src.shared import base_types
+from src.shared.adapters.persistence import dynamodb_codec
+from src.company.domain import aggregate
+
+
+class FooId(base_types.EntityId):
+    value: str
+
+
+class Foo(base_types.RootEntity):
+    id: FooId
+    status: base_types.Country
+    amount: decimal.Decimal
+    tags: List[str]
+    extra: Optional[int] = None
+    counters: Dict[str, int] = {}
+
+
+@pytest.fixture
+def foo() -> Foo:
+    return Foo(
+        id=FooId(value="foo"),
+        status=base_types.Country.ARG,
+        amount=decimal.Decimal("10.5"),
+        tags=["a", "b"],
+        counters={"x": 1},
+    )
+
+
+@pytest.mark.unittest
+def test_should_codec_be_cached_by_type() -> None:
+    assert dynamodb_codec.codec_for(Foo) is dynamodb_codec.codec_for(Foo)
+
+
+@pytest.mark.unittest
+def test_should_codec_encode_like_type_serializer(foo: Foo) -> None:
+    serializer = TypeSerializer()
+    expected = {k: serializer.serialize(v) for k, v in foo.model_dump().items()}
+    assert dynamodb_codec.codec_for(Foo).encode(foo) == expected
+
+
+@pytest.mark.unittest
+def test_should_codec_encode_many_like_encode(foo: Foo) -> None:
+    codec = dynamodb_codec.codec_for(Foo)
+    other = foo.model_copy(update={"amount": decimal.Decimal("1")})
+    fields = {"amount", "version"}
+    assert codec.encode_many([foo, other]) == [codec.encode(foo), codec.encode(other)]
+    assert codec.encode_many([foo, other], fields=fields) == [
+        codec.encode(foo, fields=fields),
+        codec.encode(other, fields=fields),
+    ]
+
+
+@pytest.mark.unittest
+def test_should_codec_decode_roundtrip(foo: Foo) -> None:
+    codec = dynamodb_codec.codec_for(Foo)
+    item = codec.encode(foo)
+    item["id._key"] = {"S": foo.id._key()}
+    record = codec.decode(item)
+    assert record["version"] == 0 and isinstance(record["version"], int)
+    assert record["id._key"] == "foo"
+    assert Foo.model_validate(record) == foo
+
+
+@pytest.mark.unittest
+def test_should_codec_encode_subclass_ids_with_all_fields() -> None:
+    class Bar(base_types.Entity):
+        ...
+
+    bar = Bar(id=aggregate.CompanyId(value="company"))
+    assert dynamodb_codec.codec_for(Bar).encode(bar) == {
+        "id": {"M": {"value": {"S": "company"}}}
+    }
+
+
+@pytest.mark.unittest
+def test_should_item_size_follow_dynamodb_rules() -> None:
+    item = {
+        "name": {"S": "abc"},
+        "amount": {"N": "-1200.50"},
+        "flag": {"BOOL": True},
+        "nested": {"M": {"a": {"S": "x"}}},
+    }
+    assert dynamodb_codec.item_size(item) == (4 + 3) + (6 + 4) + (4 + 1) + (6 + 6)
@@ -0,0 +1,104 @@
+import dataclasses
+import json
+import pytest
+from typing import List, Tuple
+from src.shared import base_types
+from src.shared.adapters import event_consumer
+from tests.src.fake_shared_adapters import EventFakeCreated, FakeEventBridgePublisher
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class EventFakeDeleted(base_types.DomainEvent):
+    domain_name: str = "EventFake"
+
+
+def sqs_record(message_id: str, event: base_types.DomainEvent) -> dict:
+    entry = FakeEventBridgePublisher().convert_to_event_bridge_event(event)
+    body = {"detail-type": entry["DetailType"], "detail": json.loads(entry["Detail"])}
+    return {"eventSource": "aws:sqs", "messageId": message_id, "body": json.dumps(body)}
+
+
+ConsumerAndHandled = Tuple[event_consumer.EventConsumer, List[base_types.DomainEvent]]
+
+
+@pytest.fixture
+def consumer_and_handled() -> ConsumerAndHandled:
+    consumer = event_consumer.EventConsumer(registry=event_consumer.EventRegistry())
+    handled: List[base_types.DomainEvent] = []
+
+    @consumer.subscribe(EventFakeCreated)
+    def on_created(event: EventFakeCreated) -> None:
+        if event.id == "fail":
+            raise ValueError("handler error")
+        handled.append(event)
+
+    return consumer, handled
+
+
+@pytest.mark.unittest
+def test_should_dispatch_typed_events_and_report_failures(
+    consumer_and_handled: ConsumerAndHandled,
+) -> None:
+    consumer, handled = consumer_and_handled
+    events = [EventFakeCreated(id="a"), EventFakeCreated(id="fail")]
+    response = consumer.handle(
+        {
+            "Records": [
+                sqs_record("1", events[0]),
+                sqs_record("2", events[1]),
+                sqs_record("3", EventFakeDeleted()),
+                {"eventSource": "aws:sqs", "messageId": "4", "body": "{}"},
+            ]
+        }
+    )
+    assert response == {
+        "batchItemFailures": [{"itemIdentifier": "2"}, {"itemIdentifier": "4"}]
+    }
+    assert handled == [events[0]]
+
+
+@pytest.mark.unittest
+def test_should_dispatch_single_event_bridge_event(
+    consumer_and_handled: ConsumerAndHandled,
+) -> None:
+    consumer, handled = consumer_and_handled
+    event = EventFakeCreated(id="a")
+    entry = FakeEventBridgePublisher().convert_to_event_bridge_event(event)
+    response = consumer.handle(
+        {"detail-type": entry["DetailType"], "detail": json.loads(entry["Detail"])}
+    )
+    assert response is None
+    assert handled == [event]
+
+
+def outbox_stream_record(
+    sequence_number: str, event: base_types.DomainEvent, event_name: str = "INSERT"
+) -> dict:
+    entry = FakeEventBridgePublisher().convert_to_event_bridge_event(event)
+    return {
+        "eventSource": "aws:dynamodb",
+        "eventName": event_name,
+        "dynamodb": {
+            "NewImage": {"id._key": {"S": event.id}, "entry": {"S": json.dumps(entry)}},
+            "SequenceNumber": sequence_number,
+        },
+    }
+
+
+@pytest.mark.unittest
+def test_should_dispatch_outbox_stream_records(
+    consumer_and_handled: ConsumerAndHandled,
+) -> None:
+    consumer, handled = consumer_and_handled
+    events = [EventFakeCreated(id="a"), EventFakeCreated(id="fail")]
+    response = consumer.handle(
+        {
+            "Records": [
+                outbox_stream_record("1", events[0]),
+                outbox_stream_record("2", events[1]),
+                outbox_stream_record("3", EventFakeCreated(id="b"), "MODIFY"),
+            ]
+        }
+    )
+    assert response == {"batchItemFailures": [{"itemIdentifier": "2"}]}
+    assert handled == [events[0]]
@@ -1,9 +1,12 @@
+import dataclasses
 import pytest
+from pytest_mock import MockerFixture
 from src.shared.adapters import event_publisher as publisher
 from src.shared import base_types
 from tests.src.fake_shared_adapters import FakeEventBridgePublisher
 
 
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
 class EventFakeCreated(base_types.DomainEvent):
     domain_name: str = "EventFake"
 
@@ -37,9 +40,124 @@ def test_should_publish_events_successfuly(
     )
     assert event_published_dict["Source"] == fake_event.domain_name
     assert event_published_dict["DetailType"] == str(type(fake_event))
-    assert event_published_dict["Detail"] == json.dumps(fake_event.model_dump())
+    assert event_published_dict["Detail"] == base_types.encode_event(fake_event)
+    assert json.loads(event_published_dict["Detail"]) == {
+        "id": fake_event.id,
+        "created": {"time_ns": fake_event.created.time_ns},
+        "domain_name": "EventFake",
+    }
+
+
+@pytest.mark.unittest
+def test_should_encode_detail_of_non_json_native_fields(
+    event_bridge_publisher: FakeEventBridgePublisher,
+) -> None:
+    import json
+    import decimal
+
+    @dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+    class EventFakeWithAmount(base_types.DomainEvent):
+        domain_name: str = "EventFake"
+        amount: decimal.Decimal
+        country: base_types.Country
+
+    fake_event = EventFakeWithAmount(
+        amount=decimal.Decimal("10.50"), country=base_types.Country.ARG
+    )
+    event_bridge_publisher.publish(events=[fake_event])
+    detail = json.loads(event_bridge_publisher.events_published[0]["Detail"])
+    assert detail["amount"] == "10.50"
+    assert detail["country"] == "ARG"
+    assert base_types.validate_event(EventFakeWithAmount, detail) == fake_event
 
 
 # @pytest.mark.unittest
 # def test_should_raise_EventPublishError_when_put_events_failed( event_bridge_publisher: publisher.FakeEventBridgePublisher, mocker) -> None:
 #     ...
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class EventFakeWithPayload(base_types.DomainEvent):
+    domain_name: str = "EventFake"
+    payload: str = ""
+
+
+@pytest.mark.unittest
+def test_should_publish_in_chunks_of_max_entries_per_call(
+    event_bridge_publisher: FakeEventBridgePublisher, mocker: MockerFixture
+) -> None:
+    put_events = mocker.spy(event_bridge_publisher, "_put_events")
+    events = [EventFakeCreated() for _ in range(25)]
+    report = event_bridge_publisher.publish(events=events)
+    assert sorted(len(c.kwargs["events"]) for c in put_events.call_args_list) == [
+        5,
+        10,
+        10,
+    ]
+    assert report.succeeded
+    assert [result.event_id for result in report.results] == [e.id for e in events]
+
+
+@pytest.mark.unittest
+def test_should_split_chunks_by_call_size(
+    event_bridge_publisher: FakeEventBridgePublisher, mocker: MockerFixture
+) -> None:
+    put_events = mocker.spy(event_bridge_publisher, "_put_events")
+    events = [EventFakeWithPayload(payload="x" * 100 * 1024) for _ in range(3)]
+    event_bridge_publisher.publish(events=events)
+    assert sorted(len(c.kwargs["events"]) for c in put_events.call_args_list) == [
+        1,
+        2,
+    ]
+
+
+@pytest.mark.unittest
+def test_should_fail_entry_bigger_than_call_size(
+    event_bridge_publisher: FakeEventBridgePublisher,
+) -> None:
+    events = [
+        EventFakeCreated(),
+        EventFakeWithPayload(payload="x" * publisher.MAX_EVENT_BRIDGE_CALL_SIZE_BYTES),
+    ]
+    with pytest.raises(publisher.EventPublishError) as error:
+        event_bridge_publisher.publish(events=events)
+    report = error.value.report
+    assert report is not None
+    assert [r.event_id for r in report.failed] == [events[1].id]
+    assert report.failed[0].error_code == "EntryTooLarge"
+    assert len(event_bridge_publisher.events_published) == 1
+
+
+@pytest.mark.unittest
+def test_should_retry_only_failed_entries(
+    event_bridge_publisher: FakeEventBridgePublisher,
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    settings = base_types.get_settings(publisher._CommonSettings)
+    monkeypatch.setattr(settings, "backoff_default_tries", 3)
+    monkeypatch.setattr(settings, "backoff_default_max_time", 5)
+    put_events = mocker.patch.object(
+        event_bridge_publisher,
+        "_put_events",
+        side_effect=[
+            {
+                "FailedEntryCount": 1,
+                "Entries": [
+                    {"EventId": "1"},
+                    {"ErrorCode": "ThrottlingException", "ErrorMessage": "slow"},
+                    {"EventId": "3"},
+                ],
+            },
+            {"FailedEntryCount": 0, "Entries": [{"EventId": "2"}]},
+        ],
+    )
+    events = [EventFakeCreated() for _ in range(3)]
+    report = event_bridge_publisher.publish(events=events)
+    assert put_events.call_count == 2
+    retried = put_events.call_args_list[1].kwargs["events"]
+    assert [e["Detail"] for e in retried] == [
+        event_bridge_publisher.convert_to_event_bridge_event(events[1])["Detail"]
+    ]
+    assert report.succeeded
+    assert [r.event_bridge_event_id for r in report.results] == ["1", "2", "3"]
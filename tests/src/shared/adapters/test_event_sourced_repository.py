@@ -0,0 +1,151 @@
+import pytest
+from typing import List, Type
+from src.employee.domain import aggregate, events
+from src.shared import base_types
+from src.shared.adapters import unit_of_work
+from src.shared.adapters.persistence.event_sourced_repository import (
+    EventSourcedRepository,
+)
+
+EMPLOYEE_EVENTS: List[Type[base_types.DomainEvent]] = [
+    events.EmployeeCreated,
+    events.EmployeeActivated,
+    events.EmployeeDisabled,
+    events.EmployeeBlocked,
+]
+
+
+def _repository(uow: unit_of_work.UnitOfWork) -> EventSourcedRepository:
+    return EventSourcedRepository(
+        session=uow.session,
+        events_table_name="employee_events",
+        snapshots_table_name="employee_snapshots",
+        entity_type=aggregate.Employee,
+        event_types=EMPLOYEE_EVENTS,
+        snapshot_every=3,
+    )
+
+
+def _new_employee() -> aggregate.Employee:
+    return aggregate.Employee.create(
+        name="Employee test",
+        email="employee_test@gmail.com",
+        company_id="test_company",
+    )
+
+
+@pytest.mark.unittest
+def test_should_rebuild_aggregate_from_its_events(
+    uow: unit_of_work.UnitOfWork,
+) -> None:
+    repository = _repository(uow)
+    employee = _new_employee()
+    employee.block()
+    with uow.transaction():
+        repository.save(item=employee, events=employee.pull_events())
+    assert employee.version == 2
+    assert not employee.dirty_fields
+
+    employee_loaded = repository.get_by_id(id=employee.id)
+    assert employee_loaded.id == employee.id
+    assert employee_loaded.company_id == "test_company"
+    assert employee_loaded.is_blocked()
+    assert employee_loaded.version == 2
+    assert not uow.session.client._data.get("employee_snapshots")
+
+
+@pytest.mark.unittest
+def test_should_load_from_snapshot_and_events_after_it(
+    uow: unit_of_work.UnitOfWork,
+) -> None:
+    repository = _repository(uow)
+    employee = _new_employee()
+    employee.inactive()
+    employee.active()
+    with uow.transaction():
+        repository.save(item=employee, events=employee.pull_events())
+    assert len(uow.session.client._data["employee_snapshots"]) == 1
+
+    employee.block()
+    with uow.transaction():
+        repository.save(item=employee, events=employee.pull_events())
+
+    # The events before the snapshot are not needed anymore
+    for sequence in range(1, 4):
+        del uow.session.client._data["employee_events"][
+            f"{employee.id._key()}#{sequence}"
+        ]
+    employee_loaded = repository.get_by_id(id=employee.id)
+    assert employee_loaded.is_blocked()
+    assert employee_loaded.version == 4
+
+
+@pytest.mark.unittest
+def test_should_fail_appending_events_concurrently(
+    uow: unit_of_work.UnitOfWork,
+) -> None:
+    repository = _repository(uow)
+    employee = _new_employee()
+    with uow.transaction():
+        repository.save(item=employee, events=employee.pull_events())
+
+    employee_concurrent = repository.get_by_id(id=employee.id)
+    employee_concurrent.block()
+    with uow.transaction():
+        repository.save(
+            item=employee_concurrent, events=employee_concurrent.pull_events()
+        )
+
+    employee.inactive()
+    with pytest.raises(unit_of_work.VersionConflictError):
+        with uow.transaction():
+            repository.save(item=employee, events=employee.pull_events())
+    assert repository.get_by_id(id=employee.id).is_blocked()
+
+
+@pytest.mark.unittest
+def test_should_find_by_id_return_none_without_events(
+    uow: unit_of_work.UnitOfWork,
+) -> None:
+    employee = _new_employee()
+    assert _repository(uow).find_by_id(id=employee.id) is None
+
+
+@pytest.mark.unittest
+def test_should_find_by_id_raise_when_events_can_not_be_loaded(
+    uow: unit_of_work.UnitOfWork,
+) -> None:
+    repository = _repository(uow)
+    employee = _new_employee()
+    employee.block()
+    with uow.transaction():
+        repository.save(item=employee, events=employee.pull_events())
+
+    repository_without_blocked = EventSourcedRepository(
+        session=uow.session,
+        events_table_name="employee_events",
+        snapshots_table_name="employee_snapshots",
+        entity_type=aggregate.Employee,
+        event_types=[events.EmployeeCreated],
+    )
+    with pytest.raises(ValueError, match="EmployeeBlocked is not registered"):
+        repository_without_blocked.find_by_id(id=employee.id)
+
+
+@pytest.mark.unittest
+def test_should_reject_aggregates_that_can_not_be_rebuilt(
+    uow: unit_of_work.UnitOfWork,
+) -> None:
+    class EmployeeWithoutApply(base_types.EventSourcedAggregate):
+        @classmethod
+        def from_event(cls, event: base_types.DomainEvent) -> "EmployeeWithoutApply":
+            raise NotImplementedError()
+
+    with pytest.raises(TypeError):
+        EventSourcedRepository(
+            session=uow.session,
+            events_table_name="employee_events",
+            snapshots_table_name="employee_snapshots",
+            entity_type=EmployeeWithoutApply,  # type: ignore[type-abstract]
+            event_types=EMPLOYEE_EVENTS,
+        )
@@ -0,0 +1,111 @@
+import pytest
+from typing import List
+from pytest_mock import MockerFixture
+from src.shared.adapters import unit_of_work
+from src.shared.adapters.persistence import dynamodb_codec, item_cache
+from src.shared.adapters.persistence.dynamodb_repository import DynamoDbRepository
+from tests.src.fake_shared_adapters import (
+    FakeDynamoDbUnitOfWork,
+    MockEntity,
+    MockEntityId,
+)
+
+
+def record(key: str) -> dict:
+    return {"id._key": {"S": key}}
+
+
+@pytest.mark.unittest
+def test_should_expire_entries_after_ttl(mocker: MockerFixture) -> None:
+    now = mocker.patch("time.monotonic", return_value=100.0)
+    cache = item_cache.ItemCache(ttl_seconds=10)
+    cache.put("1", record("1"))
+    assert cache.get("1") == record("1")
+    now.return_value = 111.0
+    assert cache.get("1") is None
+    assert (cache.hits, cache.misses, cache.size_bytes) == (1, 1, 0)
+
+
+@pytest.mark.unittest
+def test_should_evict_least_recently_used_entries() -> None:
+    cache = item_cache.ItemCache(ttl_seconds=60, max_entries=2)
+    cache.put("1", record("1"))
+    cache.put("2", record("2"))
+    cache.get("1")
+    cache.put("3", record("3"))
+    assert cache.get("2") is None
+    assert cache.get("1") and cache.get("3")
+    assert cache.evictions == 1
+
+
+@pytest.mark.unittest
+def test_should_evict_entries_beyond_max_bytes() -> None:
+    size = dynamodb_codec.item_size(record("1"))
+    cache = item_cache.ItemCache(ttl_seconds=60, max_bytes=size * 2)
+    for key in ("1", "2", "3"):
+        cache.put(key, record(key))
+    assert len(cache) == 2
+    assert cache.size_bytes == size * 2
+
+
+@pytest.mark.unittest
+def test_repository_should_read_from_cache_across_units_of_work(
+    mocker: MockerFixture,
+) -> None:
+    cache = item_cache.ItemCache(ttl_seconds=60)
+    uow = FakeDynamoDbUnitOfWork()
+
+    def repository() -> DynamoDbRepository:
+        return DynamoDbRepository(
+            session=uow.session,
+            table_name="test_table",
+            entity_type=MockEntity,
+            cache=cache,
+        )
+
+    item = MockEntity(id=MockEntityId(value="1"))
+    with uow.transaction():
+        repository().put(item)
+    get_item = mocker.spy(uow.session.client, "get_item")
+    assert repository().get_by_id(id=item.id).version == 1
+    uow.session.identity_map.clear()
+    assert repository().get_by_id(id=item.id).version == 1
+    assert get_item.call_count == 1
+
+    with uow.transaction():
+        repository().update(item)
+    assert len(cache) == 0
+    assert repository().get_by_id(id=item.id).version == 2
+
+
+@pytest.mark.unittest
+def test_repository_should_drop_cached_item_on_version_conflict() -> None:
+    cache = item_cache.ItemCache(ttl_seconds=60)
+    uow = FakeDynamoDbUnitOfWork()
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session,
+        table_name="test_table",
+        entity_type=MockEntity,
+        cache=cache,
+    )
+    other_process_repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="test_table", entity_type=MockEntity
+    )
+    item = MockEntity(id=MockEntityId(value="1"))
+    with uow.transaction():
+        repository.put(item)
+    tries: List[int] = []
+
+    @unit_of_work.retry_on_conflict(max_tries=2)
+    def update_item() -> None:
+        item = repository.get_by_id(id=MockEntityId(value="1"))
+        if not tries:
+            with uow.transaction():
+                other_process_repository.update(item.model_copy())
+        tries.append(item.version)
+        with uow.transaction():
+            repository.update(item)
+
+    update_item()
+    assert tries == [1, 2]
+    assert len(cache) == 0
@@ -0,0 +1,124 @@
+import pytest
+from pytest_mock import MockerFixture
+from typing import Any, Dict, List
+from src.shared.adapters import event_publisher, outbox, unit_of_work
+from src.shared import base_types
+from src.shared.adapters.persistence.dynamodb_repository import DynamoDbRepository
+from tests.src.fake_shared_adapters import (
+    EventFakeCreated,
+    FakeDynamoDbUnitOfWork,
+    FakeEventBridgePublisher,
+    MockEntity,
+    MockEntityId,
+)
+
+OUTBOX_TABLE = "outbox_table"
+
+
+def stream_records(uow: FakeDynamoDbUnitOfWork) -> Dict[str, Any]:
+    items = uow.session.client._data[OUTBOX_TABLE].values()
+    return {
+        "Records": [
+            {
+                "eventName": "INSERT",
+                "dynamodb": {"NewImage": item, "SequenceNumber": str(i)},
+            }
+            for i, item in enumerate(items)
+        ]
+    }
+
+
+@pytest.mark.unittest
+def test_should_write_events_in_the_outbox_within_the_transaction(
+    mocker: MockerFixture,
+) -> None:
+    uow = FakeDynamoDbUnitOfWork(outbox_table_name=OUTBOX_TABLE)
+    transact = mocker.spy(uow.session.client, "transact_write_items")
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="test_table", entity_type=MockEntity
+    )
+    events: List[base_types.DomainEvent] = [EventFakeCreated(), EventFakeCreated()]
+    with uow.transaction():
+        repository.put(item=MockEntity(id=MockEntityId(value="1")))
+        uow.publish_events(events=events)
+
+    assert transact.call_count == 1
+    tables = [
+        item["Put"]["TableName"] for item in transact.call_args.kwargs["TransactItems"]
+    ]
+    assert sorted(tables) == [OUTBOX_TABLE, OUTBOX_TABLE, "test_table"]
+    assert uow._message_bus_client.events_published == []
+    assert set(uow.session.client._data[OUTBOX_TABLE]) == {e.id for e in events}
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("context", ["batch", "bulk"])
+def test_should_reject_outbox_events_out_of_a_single_transaction(context: str) -> None:
+    uow = FakeDynamoDbUnitOfWork(outbox_table_name=OUTBOX_TABLE)
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="test_table", entity_type=MockEntity
+    )
+    with pytest.raises(unit_of_work.OutboxTransactionTypeError):
+        with getattr(uow, context)():
+            repository.put(item=MockEntity(id=MockEntityId(value="1")))
+            uow.publish_events(events=[EventFakeCreated()])
+
+    assert uow.session.client._data.get("test_table", {}) == {}
+    assert uow.session.client._data.get(OUTBOX_TABLE, {}) == {}
+
+
+@pytest.mark.unittest
+def test_should_not_create_the_events_client_in_outbox_mode(
+    mocker: MockerFixture,
+) -> None:
+    from src.shared.adapters import clients
+
+    get_events_client = mocker.spy(clients, "get_events_client")
+    uow = unit_of_work.DynamoDbUnitOfWork(outbox_table_name=OUTBOX_TABLE)
+    uow.publish_events(events=[EventFakeCreated()])
+    uow._add_events_to_outbox(table_name=OUTBOX_TABLE)
+
+    assert len(uow.session._batches) == 1
+    assert get_events_client.call_count == 0
+
+
+@pytest.mark.unittest
+def test_relay_should_publish_outbox_records() -> None:
+    uow = FakeDynamoDbUnitOfWork(outbox_table_name=OUTBOX_TABLE)
+    event = EventFakeCreated()
+    with uow.transaction():
+        uow.publish_events(events=[event])
+
+    publisher = FakeEventBridgePublisher()
+    response = outbox.OutboxRelay(publisher=publisher).handle(stream_records(uow))
+    assert response == {"batchItemFailures": []}
+    assert publisher.events_published == [
+        publisher.convert_to_event_bridge_event(domain_event=event)
+    ]
+
+
+@pytest.mark.unittest
+def test_relay_should_report_failed_records(mocker: MockerFixture) -> None:
+    uow = FakeDynamoDbUnitOfWork(outbox_table_name=OUTBOX_TABLE)
+    with uow.transaction():
+        uow.publish_events(events=[EventFakeCreated(), EventFakeCreated()])
+    records = stream_records(uow)
+    failed_image = records["Records"][1]["dynamodb"]["NewImage"]
+    failed_id = failed_image[outbox.OUTBOX_KEY_NAME]["S"]
+
+    publisher = FakeEventBridgePublisher()
+    mocker.patch.object(
+        publisher,
+        "publish_entries",
+        side_effect=event_publisher.EventPublishError(
+            report=event_publisher.PublishReport(
+                results=[
+                    event_publisher.EventPublishResult(
+                        event_id=failed_id, succeeded=False
+                    )
+                ]
+            )
+        ),
+    )
+    response = outbox.OutboxRelay(publisher=publisher).handle(records)
+    assert response == {"batchItemFailures": [{"itemIdentifier": "1"}]}
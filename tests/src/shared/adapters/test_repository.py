@@ -1,18 +1,20 @@
 import pytest
 import mock
-from typing import Any, Dict, Iterator
+from typing import Any, ClassVar, Dict, Iterator, List
 from unittest.mock import MagicMock
-from src.shared.adapters.persistence.dynamodb_repository import DynamoDbRepository
+from pytest_mock import MockerFixture
+from src.shared.adapters.persistence.dynamodb_repository import (
+    DynamoDbRepository,
+    WrongProcessTransactionTypeSelectedError,
+    _DynamoDbUpdateOperation,
+    _DynamoDbWriteOperation,
+    partial_model,
+    SortKeyCondition,
+    InvalidCursorError,
+)
 from src.shared.adapters import unit_of_work
 from src.shared import base_types
-
-
-class MockEntityId(base_types.EntityId):
-    value: str
-
-
-class MockEntity(base_types.RootEntity):
-    id: MockEntityId
+from tests.src.fake_shared_adapters import MockEntity, MockEntityId
 
 
 @pytest.fixture(scope="function")
@@ -71,3 +73,532 @@ def test_should_dynamodb_get_all_successfuly(
     result = dynamodb_repository_instance.find_by_id(item_mock.id)
     dynamodb_repository_instance.get_by_id.assert_called_once_with(id=item_mock.id)
     assert result == item_mock
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_get_many_return_items_in_input_order(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+) -> None:
+    items = [MockEntity(id=MockEntityId(value=str(i))) for i in range(3)]
+    with uow.transaction():
+        for item in items:
+            dynamodb_repository_instance.put(item)
+    ids = [items[2].id, items[0].id, items[1].id]
+    result = dynamodb_repository_instance.get_many(ids=ids)
+    assert [entity.id for entity in result] == ids
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_find_many_omit_missing_items(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+) -> None:
+    with uow.transaction():
+        dynamodb_repository_instance.put(item_mock)
+    missing_id = MockEntityId(value="missing")
+    result = dynamodb_repository_instance.find_many(ids=[item_mock.id, missing_id])
+    assert list(result) == [item_mock.id._key()]
+    with pytest.raises(ValueError):
+        dynamodb_repository_instance.get_many(ids=[item_mock.id, missing_id])
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_find_many_retry_unprocessed_keys(
+    dynamodb_repository_instance: DynamoDbRepository,
+) -> None:
+    key = {"id._key": {"S": "1"}}
+    record = {"id": {"M": {"value": {"S": "1"}}}, "id._key": {"S": "1"}}
+    client = MagicMock()
+    client.batch_get_item.side_effect = [
+        {"Responses": {}, "UnprocessedKeys": {"test_table": {"Keys": [key]}}},
+        {"Responses": {"test_table": [record]}, "UnprocessedKeys": {}},
+    ]
+    dynamodb_repository_instance._session.client = client
+    result = dynamodb_repository_instance.find_many(ids=[MockEntityId(value="1")])
+    assert client.batch_get_item.call_count == 2
+    assert client.batch_get_item.call_args_list[1].kwargs == {
+        "RequestItems": {"test_table": {"Keys": [key]}}
+    }
+    assert list(result) == ["1"]
+
+
+@pytest.fixture(scope="function")
+def dynamodb_repository_with_items(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+) -> DynamoDbRepository:
+    with uow.batch():
+        for i in range(7):
+            dynamodb_repository_instance.put(MockEntity(id=MockEntityId(value=str(i))))
+    return dynamodb_repository_instance
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("segments", [1, 3])
+def test_should_dynamodb_scan_pages_return_all_items(
+    dynamodb_repository_with_items: DynamoDbRepository, segments: int
+) -> None:
+    pages = list(
+        dynamodb_repository_with_items._scan_pages(
+            page_size=2, segments=segments, max_workers=None, max_queued_pages=1
+        )
+    )
+    keys = sorted(item["id._key"]["S"] for page in pages for item in page)
+    assert keys == [str(i) for i in range(7)]
+    assert all(len(page) <= 2 for page in pages)
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_parallel_scan_raise_segment_errors(
+    dynamodb_repository_instance: DynamoDbRepository,
+) -> None:
+    client = MagicMock()
+    client.scan.side_effect = RuntimeError("scan failed")
+    dynamodb_repository_instance._session.client = client
+    with pytest.raises(RuntimeError):
+        list(dynamodb_repository_instance.get_all(segments=2))
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_parallel_scan_stop_workers_when_closed(
+    dynamodb_repository_with_items: DynamoDbRepository,
+) -> None:
+    pages = dynamodb_repository_with_items._scan_pages(
+        page_size=1, segments=3, max_workers=None, max_queued_pages=1
+    )
+    assert next(pages)
+    pages.close()  # type: ignore
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_parallel_scan_not_start_queued_segments_when_closed(
+    dynamodb_repository_with_items: DynamoDbRepository, mocker: MockerFixture
+) -> None:
+    scan = mocker.spy(dynamodb_repository_with_items._session.client, "scan")
+    pages = dynamodb_repository_with_items._scan_pages(
+        page_size=1, segments=3, max_workers=1, max_queued_pages=1
+    )
+    assert next(pages)
+    pages.close()  # type: ignore
+    assert {call.kwargs["Segment"] for call in scan.call_args_list} == {0}
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("segments", [1, 2])
+def test_should_dynamodb_get_all_return_entities(
+    dynamodb_repository_with_items: DynamoDbRepository, segments: int
+) -> None:
+    result = list(
+        dynamodb_repository_with_items.get_all(page_size=3, segments=segments)
+    )
+    assert all(isinstance(entity, MockEntity) for entity in result)
+    assert sorted(entity.id.value for entity in result) == [str(i) for i in range(7)]
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_get_all_raw_return_deserialized_dicts(
+    dynamodb_repository_with_items: DynamoDbRepository,
+) -> None:
+    result = list(dynamodb_repository_with_items.get_all_raw(page_size=3))
+    assert len(result) == 7
+    assert all(isinstance(record, dict) for record in result)
+    assert result[0]["id"] == {"value": result[0]["id._key"]}
+
+
+@pytest.mark.unittest
+def test_should_write_operation_serialize_once(
+    dynamodb_repository_instance: DynamoDbRepository, item_mock: MockEntity
+) -> None:
+    operation = dynamodb_repository_instance._build_write_operation(
+        item=item_mock, operation_type=_DynamoDbUpdateOperation
+    )
+    assert operation.entity_serialized is operation.entity_serialized
+    assert operation.entity_serialized["Update"]["Key"] == {"id._key": {"S": "123"}}
+    assert operation.size > 0
+
+
+@pytest.mark.unittest
+def test_should_write_operation_without_request_not_be_created() -> None:
+    with pytest.raises(TypeError):
+        _DynamoDbWriteOperation(  # type: ignore[abstract]
+            table_name="test_table",
+            key_name="id._key",
+            item_serialized={"id._key": {"S": "123"}},
+        )
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_update_item_successfuly(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+) -> None:
+    with uow.transaction():
+        dynamodb_repository_instance.put(item_mock)
+    with uow.transaction():
+        dynamodb_repository_instance.update(item_mock)
+    assert dynamodb_repository_instance.get_by_id(id=item_mock.id).version == 2
+    assert item_mock.version == 2
+
+
+@pytest.mark.unittest
+def test_should_raise_version_conflict_when_item_was_updated(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+) -> None:
+    with uow.transaction():
+        dynamodb_repository_instance.put(item_mock)
+    stale_item = dynamodb_repository_instance.get_by_id(id=item_mock.id)
+    with uow.transaction():
+        dynamodb_repository_instance.update(item_mock)
+
+    with pytest.raises(unit_of_work.VersionConflictError) as error:
+        with uow.transaction():
+            dynamodb_repository_instance.update(stale_item)
+    assert error.value.ids == [item_mock.id._key()]
+    assert stale_item.version == 1
+    assert not uow.session._batches
+
+
+@pytest.mark.unittest
+def test_should_retry_on_conflict_reloading_the_item(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+) -> None:
+    with uow.transaction():
+        dynamodb_repository_instance.put(item_mock)
+    concurrent_item = item_mock.model_copy()
+    tries: List[int] = []
+
+    @unit_of_work.retry_on_conflict(max_tries=2)
+    def update_item() -> None:
+        item = dynamodb_repository_instance.get_by_id(id=item_mock.id)
+        if not tries:
+            with uow.transaction():
+                dynamodb_repository_instance.update(concurrent_item)
+        tries.append(item.version)
+        with uow.transaction():
+            dynamodb_repository_instance.update(item)
+
+    update_item()
+    assert tries == [1, 2]
+    assert dynamodb_repository_instance.get_by_id(id=item_mock.id).version == 3
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_bulk_put_items(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+) -> None:
+    ids = [MockEntityId(value=str(i)) for i in range(60)]
+    with uow.bulk():
+        for id in ids:
+            dynamodb_repository_instance.put(MockEntity(id=id))
+    assert len(dynamodb_repository_instance.get_many(ids=ids)) == 60
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_bulk_not_allow_updates(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+) -> None:
+    with pytest.raises(WrongProcessTransactionTypeSelectedError):
+        with uow.bulk():
+            dynamodb_repository_instance.update(item_mock)
+
+
+@pytest.mark.unittest
+def test_should_dynamodb_bulk_check_operations_before_writing(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+    mocker: MockerFixture,
+) -> None:
+    batch_write_item = mocker.spy(uow.session.client, "batch_write_item")
+    ids = [MockEntityId(value=str(i)) for i in range(30)]
+    with pytest.raises(WrongProcessTransactionTypeSelectedError):
+        with uow.bulk():
+            for id in ids:
+                dynamodb_repository_instance.put(MockEntity(id=id))
+            dynamodb_repository_instance.update(item_mock)
+    assert batch_write_item.call_count == 0
+    assert dynamodb_repository_instance.find_many(ids=ids) == {}
+
+
+class MockAggregate(base_types.DomainAggregate):
+    id: MockEntityId
+    name: str = "name"
+    status: str = "ENABLED"
+    _events: List[base_types.DomainEvent] = []
+
+
+@pytest.mark.unittest
+def test_should_update_only_dirty_fields(
+    uow: unit_of_work.UnitOfWork, mocker: MockerFixture
+) -> None:
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="test_table", entity_type=MockAggregate
+    )
+    with uow.transaction():
+        repository.put(MockAggregate(id=MockEntityId(value="1")))
+    item = repository.get_by_id(id=MockEntityId(value="1"))
+    item.status = "DISABLED"
+    transact = mocker.spy(uow.session.client, "transact_write_items")
+    with uow.transaction():
+        repository.update(item)
+
+    update = transact.call_args.kwargs["TransactItems"][0]["Update"]
+    assert set(update["ExpressionAttributeNames"].values()) == {"status", "version"}
+    assert item.dirty_fields == frozenset()
+    stored = repository.get_by_id(id=MockEntityId(value="1"))
+    assert (stored.status, stored.name, stored.version) == ("DISABLED", "name", 2)
+
+
+@pytest.mark.unittest
+def test_should_update_many_in_batch(uow: unit_of_work.UnitOfWork) -> None:
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="test_table", entity_type=MockAggregate
+    )
+    ids = [MockEntityId(value=str(i)) for i in range(150)]
+    with uow.transaction():
+        for id in ids[:50]:
+            repository.put(MockAggregate(id=id))
+    with uow.transaction():
+        for id in ids[50:100]:
+            repository.put(MockAggregate(id=id))
+    with uow.transaction():
+        for id in ids[100:]:
+            repository.put(MockAggregate(id=id))
+    items = repository.get_many(ids=ids)
+    for item in items:
+        item.status = "DISABLED"
+    # Items with other dirty fields are encoded apart
+    for item in items[::3]:
+        item.name = "renamed"
+
+    with uow.batch():
+        repository.update_many(items)
+
+    assert all(item.version == 2 and not item.dirty_fields for item in items)
+    stored = repository.get_many(ids=ids)
+    assert {(item.status, item.version) for item in stored} == {("DISABLED", 2)}
+    assert [item.name for item in stored] == [item.name for item in items]
+    assert {item.name for item in stored} == {"name", "renamed"}
+
+
+@pytest.mark.unittest
+def test_should_return_same_instance_from_identity_map(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+    mocker: MockerFixture,
+) -> None:
+    with uow.transaction():
+        dynamodb_repository_instance.put(item_mock)
+    get_item = mocker.spy(uow.session.client, "get_item")
+    first = dynamodb_repository_instance.get_by_id(id=item_mock.id)
+    assert dynamodb_repository_instance.get_by_id(id=item_mock.id) is first
+    assert dynamodb_repository_instance.find_many(ids=[item_mock.id]) == {
+        item_mock.id._key(): first
+    }
+    assert get_item.call_count == 1
+    assert (uow.session.identity_map.hits, uow.session.identity_map.misses) == (2, 1)
+
+
+@pytest.mark.unittest
+def test_should_identity_map_expose_pending_writes_and_clear_on_commit(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+) -> None:
+    assert dynamodb_repository_instance.find_by_id(id=item_mock.id) is None
+    with uow.transaction():
+        dynamodb_repository_instance.put(item_mock)
+        assert dynamodb_repository_instance.get_by_id(id=item_mock.id) is item_mock
+    assert len(uow.session.identity_map) == 0
+
+
+@pytest.mark.unittest
+def test_should_discard_pending_writes_when_transaction_raises(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    item_mock: MockEntity,
+) -> None:
+    with pytest.raises(ValueError):
+        with uow.transaction():
+            dynamodb_repository_instance.put(item_mock)
+            raise ValueError("Unexpected error")
+    assert not uow.session._batches
+    assert len(uow.session.identity_map) == 0
+    assert dynamodb_repository_instance.find_by_id(id=item_mock.id) is None
+
+
+@pytest.mark.unittest
+def test_should_get_partial_item_by_id(
+    uow: unit_of_work.UnitOfWork, mocker: MockerFixture
+) -> None:
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="test_table", entity_type=MockAggregate
+    )
+    with uow.transaction():
+        repository.put(MockAggregate(id=MockEntityId(value="1"), status="DISABLED"))
+    get_item = mocker.spy(uow.session.client, "get_item")
+    partial = repository.get_partial_by_id(
+        id=MockEntityId(value="1"), fields=["status", "version"]
+    )
+    assert get_item.call_args.kwargs["ProjectionExpression"] == "#p0, #p1"
+    assert partial.model_dump() == {"status": "DISABLED", "version": 1}
+    assert type(partial) is partial_model(MockAggregate, ("status", "version"))
+    assert repository.find_partial_by_id(MockEntityId(value="2"), ["status"]) is None
+    with pytest.raises(ValueError):
+        repository.find_partial_by_id(MockEntityId(value="1"), ["statuss"])
+
+
+@pytest.mark.unittest
+def test_should_get_all_partial_items(uow: unit_of_work.UnitOfWork) -> None:
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="test_table", entity_type=MockAggregate
+    )
+    with uow.batch():
+        for i in range(5):
+            repository.put(MockAggregate(id=MockEntityId(value=str(i))))
+    partials = list(repository.get_all_partial(fields=["id"], page_size=2))
+    ids = sorted(p.model_dump()["id"]["value"] for p in partials)
+    assert ids == ["0", "1", "2", "3", "4"]
+    assert not hasattr(partials[0], "status")
+
+
+@pytest.mark.unittest
+def test_should_reject_partial_model_of_unknown_fields() -> None:
+    with pytest.raises(ValueError):
+        partial_model(MockAggregate, ("unknown",))
+
+
+class MockIndexedEntity(base_types.RootEntity):
+    id: MockEntityId
+    company_id: str
+    created_day: str
+    secondary_indexes: ClassVar[List[base_types.SecondaryIndex]] = [
+        base_types.SecondaryIndex(
+            name="company-index", partition_key="company_id", sort_key="created_day"
+        )
+    ]
+
+
+@pytest.fixture
+def indexed_repository(uow: unit_of_work.UnitOfWork) -> DynamoDbRepository:
+    repository: DynamoDbRepository = DynamoDbRepository(
+        session=uow.session, table_name="test_table", entity_type=MockIndexedEntity
+    )
+    with uow.batch():
+        for i in range(5):
+            repository.put(
+                MockIndexedEntity(
+                    id=MockEntityId(value=str(i)),
+                    company_id="acme" if i % 2 else "other",
+                    created_day=f"2023-01-0{i}",
+                )
+            )
+    return repository
+
+
+@pytest.mark.unittest
+def test_should_query_by_secondary_index(
+    uow: unit_of_work.UnitOfWork,
+    indexed_repository: DynamoDbRepository,
+    mocker: MockerFixture,
+) -> None:
+    query = mocker.spy(uow.session.client, "query")
+    items = list(indexed_repository.query_by("company_id", "other", page_size=2))
+    assert [item.id.value for item in items] == ["0", "2", "4"]
+    assert query.call_count == 2
+    assert query.call_args.kwargs["IndexName"] == "company-index"
+
+
+@pytest.mark.unittest
+def test_should_query_by_secondary_index_with_sort_key_condition(
+    indexed_repository: DynamoDbRepository,
+) -> None:
+    condition = SortKeyCondition(
+        operator="between", values=("2023-01-01", "2023-01-03")
+    )
+    items = indexed_repository.query_by(
+        "company_id", "other", sort_key_condition=condition, scan_forward=False
+    )
+    assert [item.id.value for item in items] == ["2"]
+    items = indexed_repository.query_by(
+        "company_id", "acme", SortKeyCondition(operator=">", values=("2023-01-01",))
+    )
+    assert [item.id.value for item in items] == ["3"]
+
+
+@pytest.mark.unittest
+def test_should_not_query_by_field_without_index(
+    indexed_repository: DynamoDbRepository,
+) -> None:
+    with pytest.raises(ValueError):
+        list(indexed_repository.query_by("created_day", "2023-01-01"))
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_should_resume_scan_from_page_cursor(
+    uow: unit_of_work.UnitOfWork,
+    dynamodb_repository_instance: DynamoDbRepository,
+    prefetch: bool,
+) -> None:
+    with uow.batch():
+        for i in range(5):
+            dynamodb_repository_instance.put(MockEntity(id=MockEntityId(value=str(i))))
+    first_page = dynamodb_repository_instance.get_page(page_size=2)
+    assert first_page.has_more
+    pages = list(
+        dynamodb_repository_instance.get_pages(
+            cursor=first_page.cursor, page_size=2, prefetch=prefetch
+        )
+    )
+    values = [item.id.value for page in [first_page, *pages] for item in page.items]
+    assert values == ["0", "1", "2", "3", "4"]
+    assert pages[-1].cursor is None
+
+
+@pytest.mark.unittest
+def test_should_query_page_by_cursor(indexed_repository: DynamoDbRepository) -> None:
+    page = indexed_repository.query_page("company_id", "other", page_size=2)
+    next_page = indexed_repository.query_page(
+        "company_id", "other", cursor=page.cursor, page_size=2
+    )
+    assert [item.id.value for item in page.items + next_page.items] == ["0", "2", "4"]
+    assert not next_page.has_more
+
+
+@pytest.mark.unittest
+def test_should_reject_cursor_of_other_request(
+    indexed_repository: DynamoDbRepository,
+) -> None:
+    page = indexed_repository.query_page("company_id", "other", page_size=2)
+    with pytest.raises(InvalidCursorError):
+        indexed_repository.get_page(cursor=page.cursor)
+    with pytest.raises(InvalidCursorError):
+        indexed_repository.get_page(cursor="not-a-cursor")
+
+
+@pytest.mark.unittest
+def test_should_reject_cursor_of_other_key_condition(
+    indexed_repository: DynamoDbRepository,
+) -> None:
+    page = indexed_repository.query_page("company_id", "other", page_size=2)
+    with pytest.raises(InvalidCursorError):
+        indexed_repository.query_page("company_id", "acme", cursor=page.cursor)
+    with pytest.raises(InvalidCursorError):
+        indexed_repository.query_page(
+            "company_id",
+            "other",
+            cursor=page.cursor,
+            sort_key_condition=SortKeyCondition(operator=">", values=("2023",)),
+        )
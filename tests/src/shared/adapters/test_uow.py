@@ -1,5 +1,6 @@
 import pytest
 import mock
+from pytest_mock import MockerFixture
 from src.shared.adapters import unit_of_work
 from src.shared.adapters.persistence import commons as persistence_commons
 
@@ -8,6 +9,7 @@ from src.shared.adapters.persistence import commons as persistence_commons
 def test_should_TransitionTypes_are_correct_values() -> None:
     assert unit_of_work.TransactionType.SINGLE == "SINGLE"
     assert unit_of_work.TransactionType.BATCH == "BATCH"
+    assert unit_of_work.TransactionType.BULK == "BULK"
     assert unit_of_work.TransactionType.NONE == "NONE"
 
 
@@ -80,6 +82,129 @@ def test_should_commit_batch_transaction_successfuly(
     mock_execute_batch.assert_called_once()
 
 
+@pytest.mark.unittest
+def test_should_single_transaction_raise_error_when_size_exceeds(
+    dynamodb_uow: unit_of_work.DynamoDbUnitOfWork,
+) -> None:
+    operation = mock.MagicMock(
+        id="1", size=unit_of_work.MAX_DYNAMO_DB_TRX_SIZE_BYTES + 1
+    )
+    dynamodb_uow.session.add_write_operation(operation)
+    with pytest.raises(unit_of_work.DynamoTransactionSizeExceedsError):
+        dynamodb_uow.session.execute_in_single_transaction()
+
+
+@pytest.mark.unittest
+def test_should_split_operations_per_transaction_by_qty_and_size() -> None:
+    max_size = unit_of_work.MAX_DYNAMO_DB_TRX_SIZE_BYTES
+    small_operations = [mock.MagicMock(size=1) for _ in range(150)]
+    big_operations = [mock.MagicMock(size=max_size // 2 + 1) for _ in range(2)]
+    chunks = list(
+        unit_of_work.split_operations_per_transaction(
+            operations=small_operations + big_operations
+        )
+    )
+    assert [len(chunk) for chunk in chunks] == [100, 51, 1]
+
+
+def _add_fake_operations(session: persistence_commons.SessionDB, qty: int) -> None:
+    for i in range(qty):
+        session.add_write_operation(mock.MagicMock(id=str(i), size=1))
+
+
+@pytest.mark.unittest
+def test_should_batch_transaction_commit_chunks_concurrently(
+    dynamodb_uow: unit_of_work.DynamoDbUnitOfWork, mocker: MockerFixture
+) -> None:
+    persist_mock = mocker.patch.object(dynamodb_uow._session, "_presist_operations")
+    _add_fake_operations(session=dynamodb_uow.session, qty=250)
+    report = dynamodb_uow.session.execute_in_batch_transaction(max_workers=3)
+    assert persist_mock.call_count == 3
+    assert report.succeeded
+    assert [chunk.operations_qty for chunk in report.chunks] == [100, 100, 50]
+    assert not dynamodb_uow.session._batches
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize(
+    "max_workers, chunks_reported, operations_pending", [(1, 2, 150), (3, 3, 100)]
+)
+def test_should_batch_transaction_report_failed_chunks(
+    dynamodb_uow: unit_of_work.DynamoDbUnitOfWork,
+    mocker: MockerFixture,
+    max_workers: int,
+    chunks_reported: int,
+    operations_pending: int,
+) -> None:
+    def persist(operations):
+        if operations[0].id == "100":
+            raise unit_of_work.TransactionThrottledError("Throttled")
+
+    mocker.patch.object(
+        dynamodb_uow._session, "_presist_operations", side_effect=persist
+    )
+    _add_fake_operations(session=dynamodb_uow.session, qty=250)
+    with pytest.raises(unit_of_work.BatchTransactionFailedError) as error:
+        dynamodb_uow.session.execute_in_batch_transaction(max_workers=max_workers)
+    report = error.value.report
+    assert len(report.chunks) == chunks_reported
+    assert [chunk.index for chunk in report.failed_chunks] == [1]
+    assert report.throttled_chunks == report.failed_chunks
+    assert len(dynamodb_uow.session._batches) == operations_pending
+    assert error.value.pending_ids == [*dynamodb_uow.session._batches]
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("max_workers, operations_pending", [(1, 150), (3, 100)])
+def test_should_batch_transaction_remove_chunks_written_before_an_error(
+    dynamodb_uow: unit_of_work.DynamoDbUnitOfWork,
+    mocker: MockerFixture,
+    max_workers: int,
+    operations_pending: int,
+) -> None:
+    def persist(operations):
+        if operations[0].id == "100":
+            raise RuntimeError("Unexpected error")
+
+    mocker.patch.object(
+        dynamodb_uow._session, "_presist_operations", side_effect=persist
+    )
+    _add_fake_operations(session=dynamodb_uow.session, qty=250)
+    with pytest.raises(RuntimeError):
+        dynamodb_uow.session.execute_in_batch_transaction(max_workers=max_workers)
+    assert len(dynamodb_uow.session._batches) == operations_pending
+
+
+@pytest.mark.unittest
+def test_should_bulk_context_create_successfuly(
+    dynamodb_uow: unit_of_work.DynamoDbUnitOfWork, mocker: MockerFixture
+) -> None:
+    mock_execute_bulk = mocker.patch.object(dynamodb_uow._session, "execute_in_bulk")
+    with dynamodb_uow.bulk(max_workers=2):
+        transaction_type = dynamodb_uow._transaction_type
+    assert transaction_type == unit_of_work.TransactionType.BULK
+    assert dynamodb_uow._transaction_type == unit_of_work.TransactionType.NONE
+    mock_execute_bulk.assert_called_once_with(max_workers=2)
+
+
+@pytest.mark.unittest
+def test_should_bulk_retry_unprocessed_items(
+    dynamodb_uow: unit_of_work.DynamoDbUnitOfWork, mocker: MockerFixture
+) -> None:
+    request = {"PutRequest": {"Item": {"id._key": {"S": "1"}}}}
+    client = mocker.patch.object(dynamodb_uow._session, "client")
+    client.batch_write_item.side_effect = [
+        {"UnprocessedItems": {"table": [request]}},
+        {"UnprocessedItems": {}},
+    ]
+    dynamodb_uow.session.add_write_operation(
+        mock.MagicMock(id="1", table_name="table", bulk_request=request)
+    )
+    report = dynamodb_uow.session.execute_in_bulk(max_workers=1)
+    assert report.succeeded
+    assert client.batch_write_item.call_count == 2
+
+
 # @pytest.mark.unittest
 # def test_should_dynamodb_uow_deserializer_item_successfuly(
 #     dynamodb_uow: unit_of_work.DynamoDbUnitOfWork,
@@ -1,8 +1,10 @@
+import dataclasses
 import pytest
 import mock
 from typing import List
 from src.shared import base_types
 import pydantic
+import pydantic_settings
 
 
 class FooId(base_types.EntityId):
@@ -14,6 +16,24 @@ def test_should_UUIDGenerator_generate_uuid() -> None:
     assert isinstance(base_types.UUIDGenerator.uuid(), str)
 
 
+@pytest.mark.unittest
+def test_should_validate_events_only_at_the_boundaries() -> None:
+    @dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+    class FooCreated(base_types.DomainEvent):
+        domain_name: str = "Foo"
+        amount: int
+
+    event = FooCreated(amount="1")  # type: ignore[arg-type]
+    assert not hasattr(event, "__dict__")
+    assert base_types.validate_event(FooCreated, event).amount == 1
+    with pytest.raises(pydantic.ValidationError):
+        base_types.validate_event(FooCreated, FooCreated(amount="x"))  # type: ignore[arg-type]
+    data = {"id": "1", "created": {"time_ns": 1}, "amount": 2, "unknown": 3}
+    assert base_types.validate_event(FooCreated, data) == FooCreated(
+        id="1", created=base_types.EpochTime(time_ns=1), amount=2
+    )
+
+
 @pytest.mark.unittest
 def test_should_ValueObject_instace_inmutable() -> None:
     class Foo(base_types.ValueObject):
@@ -94,3 +114,53 @@ def test_split_list_negative_chunk_size_raise_error():
     chunk_size = -2
     with pytest.raises(ValueError):
         list(base_types.split_list(input_list, chunk_size))
+
+
+@pytest.mark.unittest
+def test_should_get_settings_parse_once() -> None:
+    class FooSettings(base_types.Settings):
+        foo: str = "foo"
+
+    assert base_types.get_settings(FooSettings) is base_types.get_settings(FooSettings)
+
+
+@pytest.mark.unittest
+def test_should_load_settings_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    class FooSettings(base_types.Settings):
+        foo: str = "foo"
+        bar: int = 0
+
+    monkeypatch.setenv("FOO", "from env")
+    monkeypatch.setenv("BAR", "1")
+    settings = FooSettings.load(bar=2)
+    assert isinstance(settings, FooSettings)
+    assert (settings.foo, settings.bar) == ("from env", 2)
+
+
+@pytest.mark.unittest
+def test_should_load_settings_with_the_model_config_of_the_type(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class AppSettings(base_types.Settings):
+        model_config = pydantic_settings.SettingsConfigDict(env_prefix="APP_")
+        name: str = "default"
+
+    monkeypatch.setenv("APP_NAME", "from env")
+    assert AppSettings.load().name == "from env"
+
+
+@pytest.mark.unittest
+def test_should_load_settings_ignoring_unknown_values() -> None:
+    class FooSettings(base_types.Settings):
+        foo: str = "foo"
+
+    assert FooSettings.load(unknown=1).foo == "foo"
+
+
+@pytest.mark.unittest
+def test_should_settings_not_be_created_without_load() -> None:
+    class FooSettings(base_types.Settings):
+        foo: str = "foo"
+
+    with pytest.raises(base_types.SettingsNotLoadedError):
+        FooSettings()